@@ -0,0 +1,6 @@
+def __getattr__(name):
+    # Exported lazily, so that importing the package does not import Django's ORM
+    if name == 'unit_of_work':
+        from .unitofwork import unit_of_work
+        return unit_of_work
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,185 @@
+"""
+Profile-guided selection of the parents to fetch with broken-down models
+
+Querysets put in adaptive mode (with :py:meth:`BrokenDownQuerySet.adaptive_parents()
+<bdmodels.models.BrokenDownQuerySet.adaptive_parents>`) report, for their *origin* --
+the place in the code where they are evaluated, or a name given explicitly --
+which parents had to be loaded lazily for the objects they fetched. A
+:py:class:`ParentUsageProfile` collects these reports, and tells later querysets
+from the same origin which parents they should fetch up front.
+"""
+import sys
+import threading
+
+
+def call_site():
+    """
+    Describe the innermost frame on the stack which is not in Django or in this library,
+    as ``"module:line"``.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.partition('.')[0] not in ('django', 'bdmodels'):
+            return f"{module}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+class _OriginStats:
+    __slots__ = ('count', 'fetches', 'hidden', 'loads', 'tick')
+
+    def __init__(self, tick):
+        self.count = 0
+        self.fetches = 0.0
+        self.hidden = {}
+        self.loads = {}
+        self.tick = tick
+
+    def age(self, tick, decay):
+        """Apply the decay for the fetches recorded (anywhere) since this origin was last seen"""
+        factor = decay ** (tick - self.tick)
+        self.fetches *= factor
+        for counts in (self.hidden, self.loads):
+            for label in counts:
+                counts[label] *= factor
+        self.tick = tick
+
+    def observed(self, label):
+        """The (decayed) number of fetches where the use of the parent ``label`` could be seen"""
+        return self.fetches - self.hidden.get(label, 0.0)
+
+
+class ParentUsageProfile:
+    """
+    A table of the parents used by the objects fetched from each origin.
+
+    For every origin, the profile keeps, for each parent, a count of the fetches where
+    its use could be observed -- those where it was not fetched up front, so that using
+    it meant loading it lazily -- and a count of those where it was used. A parent is
+    selected for an origin when the ratio between these reaches ``threshold``.
+
+    Counts decay as fetches are recorded, so that old behavior is gradually forgotten;
+    ``half_life`` is the number of fetches (from all origins) after which a count is
+    worth half its original value. At most ``max_origins`` origins are kept; when more
+    are seen, those with the lowest (decayed) fetch counts are dropped.
+
+    Parents which are fetched up front are not loaded lazily, so the profile cannot tell
+    if they are really used. To keep learning, one of every ``probe_interval`` fetches
+    from an origin is a *probe*, which fetches none of the selected parents up front
+    (see :py:meth:`parents_to_fetch`); so a parent which is no longer used is eventually
+    dropped from the selection.
+
+    The selections can be exported (:py:meth:`export`) as a simple, JSON-compatible
+    dictionary, and a frozen profile, which only applies the exported selections and
+    learns nothing new, can be created from it (:py:meth:`from_export`).
+    """
+
+    def __init__(self, *, threshold: float = 0.5, half_life: int = 10000, max_origins: int = 1000,
+                 probe_interval: int = 20):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in the range (0, 1]")
+        if half_life <= 0 or max_origins <= 0:
+            raise ValueError("half_life and max_origins must be positive")
+        if probe_interval < 2:
+            raise ValueError("probe_interval must be at least 2")
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.max_origins = max_origins
+        self._decay = 0.5 ** (1 / half_life)
+        self._origins = {}
+        self._tick = 0
+        self._frozen = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_export(cls, table: dict):
+        """Create a frozen profile which selects parents as specified in ``table``"""
+        profile = cls()
+        profile._frozen = {origin: frozenset(labels) for origin, labels in table.items()}
+        return profile
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen is not None
+
+    def parents_for(self, origin: str) -> frozenset:
+        """The labels of the parents selected for ``origin``"""
+        if self._frozen is not None:
+            return self._frozen.get(origin, frozenset())
+        with self._lock:
+            stats = self._origins.get(origin)
+            if stats is None or not stats.fetches:
+                return frozenset()
+            return frozenset(
+                label for label, loads in stats.loads.items()
+                if stats.observed(label) > 0 and loads / stats.observed(label) >= self.threshold
+            )
+
+    def parents_to_fetch(self, origin: str) -> frozenset:
+        """
+        The labels of the parents to fetch up front for the next fetch from ``origin``:
+        those selected for it, except when that fetch is a probe
+        """
+        if self._frozen is None:
+            stats = self._origins.get(origin)
+            if stats is not None and stats.count % self.probe_interval == self.probe_interval - 1:
+                return frozenset()
+        return self.parents_for(origin)
+
+    def record_fetch(self, origin: str, selected=()):
+        """Record a fetch from ``origin``, where the parents labeled ``selected`` were fetched up front"""
+        if self._frozen is not None:
+            return
+        with self._lock:
+            self._tick += 1
+            stats = self._origins.get(origin)
+            if stats is None:
+                if len(self._origins) >= self.max_origins:
+                    self._evict()
+                stats = self._origins[origin] = _OriginStats(self._tick)
+            stats.age(self._tick, self._decay)
+            stats.count += 1
+            stats.fetches += 1
+            # Their use, if any, could not be seen
+            for label in selected:
+                stats.hidden[label] = stats.hidden.get(label, 0.0) + 1
+
+    def record_load(self, origin: str, parent_label: str):
+        """Record that a parent had to be loaded lazily for objects fetched from ``origin``"""
+        if self._frozen is not None:
+            return
+        with self._lock:
+            stats = self._origins.get(origin)
+            if stats is None:
+                # Evicted since the fetch
+                return
+            stats.age(self._tick, self._decay)
+            stats.loads[parent_label] = stats.loads.get(parent_label, 0.0) + 1
+
+    def _evict(self):
+        for stats in self._origins.values():
+            stats.age(self._tick, self._decay)
+        # Drop the least-used quarter, to avoid evicting on every new origin
+        by_use = sorted(self._origins, key=lambda origin: self._origins[origin].fetches)
+        for origin in by_use[:max(len(by_use) // 4, 1)]:
+            del self._origins[origin]
+
+    def export(self) -> dict:
+        """The current selections, as a dictionary mapping origins to lists of parent model labels"""
+        if self._frozen is not None:
+            return {origin: sorted(labels) for origin, labels in self._frozen.items()}
+        table = {}
+        for origin in list(self._origins):
+            labels = self.parents_for(origin)
+            if labels:
+                table[origin] = sorted(labels)
+        return table
+
+    def clear(self):
+        """Forget everything learned so far"""
+        with self._lock:
+            self._origins.clear()
+
+
+default_profile = ParentUsageProfile()
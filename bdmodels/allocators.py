@@ -0,0 +1,122 @@
+"""
+Allocation of primary keys for broken-down models in advance of inserts
+
+A broken-down model with a :py:attr:`pk_allocator <bdmodels.models.BrokenDownModel.pk_allocator>`
+gets the primary keys of new objects from it when they are saved or bulk-created, rather
+than from the database as the object's own row is inserted. The objects then have their
+primary keys before anything is written, so the rows of all the parts can be inserted
+freely, and bulk creation of objects without primary keys works also on backends which
+cannot return rows from bulk inserts.
+
+An allocator must be the only source of primary keys for its model: rows inserted
+bypassing it (e.g. by raw SQL, or by other programs) must not take keys it may hand out.
+"""
+import threading
+
+from django.db import NotSupportedError, connections, transaction
+from django.db.models import Max
+
+
+class PKAllocator:
+    """Base class for primary key allocators"""
+
+    def allocate(self, model, count: int, using: str) -> list:
+        """Return ``count`` new primary keys for the (concrete) ``model`` in database ``using``"""
+        raise NotImplementedError("Subclasses of PKAllocator must implement allocate()")
+
+
+class SequenceAllocator(PKAllocator):
+    """
+    Reserve primary keys from the sequence of the model's primary key column.
+
+    The keys come from the same sequence the database uses for rows inserted without them,
+    so this allocator can be mixed with other inserts. Each allocation takes one query,
+    regardless of the number of keys. Only supported on PostgreSQL.
+
+    :param sequence: The name of the sequence; by default, the one owned by the primary key column
+    """
+
+    def __init__(self, sequence: str = None):
+        self.sequence = sequence
+
+    def allocate(self, model, count, using):
+        connection = connections[using]
+        if connection.vendor != 'postgresql':
+            raise NotSupportedError(f"SequenceAllocator is not supported on {connection.vendor}")
+        meta = model._meta
+        if self.sequence is not None:
+            sequence, params = "%s::regclass", [connection.ops.quote_name(self.sequence)]
+        else:
+            sequence, params = "pg_get_serial_sequence(%s, %s)", [
+                connection.ops.quote_name(meta.db_table), meta.pk.column,
+            ]
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT nextval({sequence}) FROM generate_series(1, %s)", [*params, count])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class HiLoAllocator(PKAllocator):
+    """
+    Hand out primary keys from blocks of ``block_size`` consecutive keys.
+
+    A block is reserved by incrementing a counter in the database -- the *hi* value --
+    and its keys are then handed out from memory -- the *lo* values; so most allocations
+    take no queries at all. The counters are kept in the table of
+    :py:class:`HiLoCounter <bdmodels.hilo.models.HiLoCounter>`, one for each model, and are
+    started above the largest primary key in the model's table; using this allocator
+    requires adding ``'bdmodels.hilo'`` to ``INSTALLED_APPS``.
+
+    The remainder of a block reserved in a transaction is only kept for later allocations
+    when the transaction is committed; the counter would be rolled back with it.
+    Note that the counter's row stays locked until then.
+    """
+
+    def __init__(self, block_size: int = 100):
+        if not block_size > 0:
+            raise ValueError("block_size must be positive")
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, model, count, using):
+        key = (model._meta.label, using)
+        with self._lock:
+            start, end = self._blocks.pop(key, (0, 0))
+            taken = min(count, end - start)
+            pks = list(range(start, start + taken))
+            start += taken
+            if start < end:
+                self._blocks[key] = (start, end)
+        if taken < count:
+            blocks = -(-(count - taken) // self.block_size)
+            hi = self._reserve(model, blocks, using)
+            start, end = hi * self.block_size, (hi + blocks) * self.block_size
+            pks.extend(range(start, start + count - taken))
+            start += count - taken
+            if start < end:
+                transaction.on_commit(lambda: self._keep(key, start, end), using=using)
+        return pks
+
+    def _keep(self, key, start, end):
+        with self._lock:
+            self._blocks[key] = (start, end)
+
+    def _reserve(self, model, blocks, using):
+        """Increment the model's counter by ``blocks``, returning its previous value"""
+        # Imported here, so that the app is only required when the allocator is used
+        from .hilo.models import HiLoCounter
+
+        counters = HiLoCounter.objects.using(using)
+        with transaction.atomic(using=using):
+            try:
+                counter = counters.select_for_update().get(model=model._meta.label)
+            except HiLoCounter.DoesNotExist:
+                largest = model._base_manager.using(using).aggregate(largest=Max('pk'))['largest']
+                start = (largest or 0) // self.block_size + 1
+                counter, _ = counters.select_for_update().get_or_create(
+                    model=model._meta.label, defaults={'next_hi': start},
+                )
+            hi = counter.next_hi
+            counter.next_hi += blocks
+            counter.save(update_fields=['next_hi'])
+        return hi
@@ -0,0 +1,155 @@
+"""
+Detection of 1+N patterns caused by lazy loading of parents
+"""
+import collections
+import contextlib
+import logging
+import os
+import sys
+import traceback
+import warnings
+import weakref
+
+import django
+
+from .signals import parts_loaded
+
+logger = logging.getLogger('bdmodels.detection')
+
+
+class RepeatedPartLoad(Exception):
+    """Raised by a :py:class:`PartLoadDetector` in strict mode"""
+
+
+class RepeatedPartLoadWarning(UserWarning):
+    """Issued by a :py:class:`PartLoadDetector` in warning mode"""
+
+
+_LIBRARY_DIRS = (
+    os.path.dirname(django.__file__) + os.sep,
+    os.path.dirname(__file__) + os.sep,
+)
+
+
+def _user_stack():
+    """The current stack, up to the last frame outside Django and this library"""
+    stack = traceback.extract_stack()
+    while stack and stack[-1].filename.startswith(_LIBRARY_DIRS):
+        stack.pop()
+    return stack
+
+
+def _user_stacklevel():
+    """The ``stacklevel``, for a warning issued by the caller, of the last frame outside Django and this library"""
+    frame, level = sys._getframe(1), 1
+    while frame is not None and frame.f_code.co_filename.startswith(_LIBRARY_DIRS):
+        frame, level = frame.f_back, level + 1
+    return level
+
+
+class PartLoadDetector:
+    """
+    Report objects, fetched together by one queryset, whose parents are then loaded one at a time.
+
+    When a parent of an object is loaded lazily, and the same parent was already loaded
+    lazily for ``threshold - 1`` other objects fetched together with it, this is likely a
+    1+N pattern which could be avoided with :py:meth:`select_related()
+    <bdmodels.models.BrokenDownQuerySet.select_related>` or similar. The detector then
+    reports it, with the traceback of the access which triggered the load, according to
+    ``action``:
+
+    ``"warn"``
+        Issue a :py:class:`RepeatedPartLoadWarning`
+    ``"log"``
+        Log a warning to the ``bdmodels.detection`` logger
+    ``"raise"``
+        Raise :py:class:`RepeatedPartLoad` (strict mode)
+
+    Each pattern is reported once for each set of objects.
+
+    The detector is active between calls to :py:meth:`install` and :py:meth:`uninstall`,
+    or when used as a context manager. It only sees objects fetched by evaluating a
+    queryset while it is active.
+    """
+
+    ACTIONS = ('warn', 'log', 'raise')
+
+    def __init__(self, action: str = 'warn', *, threshold: int = 2):
+        if action not in self.ACTIONS:
+            raise ValueError(f"action must be one of {', '.join(self.ACTIONS)}")
+        if threshold < 2:
+            raise ValueError("threshold must be at least 2")
+        self.action = action
+        self.threshold = threshold
+        self._counts = weakref.WeakKeyDictionary()
+
+    def install(self):
+        parts_loaded.connect(self._parts_loaded, dispatch_uid=id(self))
+        return self
+
+    def uninstall(self):
+        parts_loaded.disconnect(dispatch_uid=id(self))
+        self._counts.clear()
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+
+    def _parts_loaded(self, sender, instance, parents, fetch_group, **kwargs):
+        if fetch_group is None:
+            return
+        counts = self._counts.setdefault(fetch_group, collections.Counter())
+        for parent in parents:
+            counts[parent] += 1
+            if counts[parent] == self.threshold:
+                self.report(sender, parent, _user_stack())
+
+    def report(self, model, parent, stack):
+        message = (
+            f"{parent._meta.label} was loaded separately for {self.threshold} {model._meta.label} "
+            f"objects fetched together; consider fetching it with the objects.\n"
+            f"{''.join(traceback.format_list(stack))}"
+        )
+        if self.action == 'raise':
+            raise RepeatedPartLoad(message)
+        elif self.action == 'log':
+            logger.warning(message)
+        else:
+            warnings.warn(message, RepeatedPartLoadWarning, stacklevel=_user_stacklevel())
+
+
+class PartLoadAssertionsMixin:
+    """
+    A mixin for test cases, adding an assertion about lazy loading of parents
+    """
+
+    @contextlib.contextmanager
+    def assertPartsLoaded(self, model, expected: dict):
+        """
+        Assert the number of times each parent of ``model`` is loaded lazily in the context.
+
+        :param model: The broken-down model whose objects are watched (including proxies and subclasses)
+        :param expected: A dictionary mapping parent models to the expected number of loads;
+                         parents not included are expected not to be loaded at all
+        """
+        counts = collections.Counter()
+
+        def count(sender, parents, **kwargs):
+            if issubclass(sender, model):
+                counts.update(parents)
+
+        parts_loaded.connect(count, weak=False)
+        try:
+            yield
+        finally:
+            parts_loaded.disconnect(count)
+        expected = {parent: times for parent, times in expected.items() if times}
+        actual = dict(counts)
+        if actual != expected:
+            def describe(loads):
+                return ", ".join(f"{parent._meta.label}: {times}" for parent, times in loads.items()) or "none"
+            self.fail(
+                f"Parts of {model._meta.label} loaded: {describe(actual)}; expected: {describe(expected)}"
+            )
@@ -38,7 +38,26 @@ class VirtualForwardManyToOneDescriptor(ReadOnlyForwardRelationDescriptor, Forwa
 
 
 class VirtualForwardOneToOneDescriptor(ReadOnlyForwardRelationDescriptor, ForwardOneToOneDescriptor):
-    pass
+
+    def get_object(self, instance):
+        # For a parent link, Django builds the parent object from the instance's fields,
+        # if they are all loaded; otherwise, it fetches the parent separately, leaving the
+        # instance's fields deferred. We load the fields into the instance instead -- the
+        # way any access to a deferred parent field would -- and then the parent is built
+        # from them.
+        if self.field.remote_field.parent_link:
+            deferred = instance.get_deferred_fields()
+            rel_model = self.field.remote_field.model
+            missing = [f.attname for f in rel_model._meta.concrete_fields if f.attname in deferred]
+            if missing:
+                instance.refresh_from_db(fields=missing)
+            if self.field.sparse and getattr(instance, rel_model._meta.pk.attname) is None:
+                # The row of a sparse part is missing; what we have is defaults, not yet saved
+                obj = super().get_object(instance)
+                obj.pk = getattr(instance, self.field.attname)
+                obj._state.adding = True
+                return obj
+        return super().get_object(instance)
 
 
 class VirtualForeignKey(ForeignKey):
@@ -209,14 +228,34 @@ class VirtualOneToOneField(OneToOneField, VirtualForeignKey):
     and vice versa -- it is also to :py:class:`VirtualForeignKey` as a
     :py:class:`OneToOneField <django.db.models.OneToOneField>` is to a
     :py:class:`ForeignKey <django.db.models.ForeignKey>`.
+
+    A parent link can be made *sparse*, by passing ``sparse=True``: Then the parent's
+    row is only created when some of its fields are set to values other than their
+    defaults, and a missing row is loaded as defaults. See :ref:`sparse_parts` for details.
     """
     description = _("One-to-one relationship based on existing field")
 
     forward_related_accessor_class = VirtualForwardOneToOneDescriptor
 
-    def __init__(self, to, from_field, on_delete, to_field=None, **kwargs):
+    # Whether a field is sparse does not change the database schema
+    non_db_attrs = OneToOneField.non_db_attrs + ('sparse',)
+
+    def __init__(self, to, from_field, on_delete, to_field=None, sparse=False, **kwargs):
         kwargs['unique'] = True
+        if sparse:
+            if not kwargs.get('parent_link'):
+                raise ValueError("Only a parent link can be sparse")
+            # Make queries use outer joins for the parent
+            kwargs['null'] = True
         super(OneToOneField, self).__init__(to, from_field, on_delete, to_field=to_field, **kwargs)
+        self.sparse = sparse
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.sparse:
+            del kwargs['null']
+            kwargs['sparse'] = True
+        return name, path, args, kwargs
 
 
 class VirtualParentLink(VirtualOneToOneField):
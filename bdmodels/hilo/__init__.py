@@ -0,0 +1,6 @@
+"""
+The counters of :py:class:`HiLoAllocator <bdmodels.allocators.HiLoAllocator>`
+
+This is a separate app, to be added to ``INSTALLED_APPS`` (as ``'bdmodels.hilo'``)
+only by projects using the allocator.
+"""
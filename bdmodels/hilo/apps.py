@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class HiLoConfig(AppConfig):
+    name = 'bdmodels.hilo'
+    label = 'bdmodels_hilo'
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HiLoCounter',
+            fields=[
+                ('model', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('next_hi', models.BigIntegerField()),
+            ],
+        ),
+    ]
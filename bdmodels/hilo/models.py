@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class HiLoCounter(models.Model):
+    """
+    The counters of blocks of primary keys reserved by a
+    :py:class:`HiLoAllocator <bdmodels.allocators.HiLoAllocator>`, one for each model.
+    """
+    model = models.CharField(max_length=255, primary_key=True)
+    next_hi = models.BigIntegerField()
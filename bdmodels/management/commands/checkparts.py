@@ -0,0 +1,149 @@
+"""
+The ``checkparts`` management command: finding, and repairing, missing and orphan rows of parts
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+
+from bdmodels.models import BrokenDownModel
+from bdmodels.parts import missing_part_rows, pk_chunks, populate_part_sql
+
+
+class Command(BaseCommand):
+    help = (
+        "Find objects of broken-down models without rows in the tables of their parts, and rows "
+        "of parts without objects; optionally, create the missing rows or delete the orphan ones. "
+        "Rows of a part without objects are legitimate if the part's model is also used on its own."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'args', metavar='app_label[.ModelName]', nargs='*',
+            help="Only check the broken-down models of these apps, or these models.",
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='The database to check. Defaults to the "default" database.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help="The number of rows to check, or repair, at a time. Defaults to 10000.",
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help="Create the missing rows of parts, with the defaults of their fields.",
+        )
+        parser.add_argument(
+            '--delete-orphans', action='append', default=[], metavar='app_label.ModelName',
+            help="Delete the rows of this part which belong to no object. Only use this for parts "
+                 "whose models are never used on their own, as their rows would be deleted as well. "
+                 "Can be given more than once.",
+        )
+
+    def handle(self, *labels, database, chunk_size, create_missing, delete_orphans, **options):
+        if not chunk_size > 0:
+            raise CommandError("--chunk-size must be positive")
+        connection = connections[database]
+        try:
+            delete_orphans = {apps.get_model(label) for label in delete_orphans}
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e)) from None
+        models = [
+            model for model in self._models(labels)
+            if router.allow_migrate_model(database, model)
+        ]
+        parts = dict.fromkeys(parent for model in models for parent in model._meta.get_parent_list())
+        unknown = delete_orphans.difference(parts)
+        if unknown:
+            raise CommandError(
+                f"Not a part of the checked models: {', '.join(sorted(model._meta.label for model in unknown))}"
+            )
+        found = 0
+        for model in models:
+            for parent in model._meta.get_parent_list():
+                link = model._meta.parents.get(parent)
+                if getattr(link, 'sparse', False):
+                    # Missing rows are expected
+                    continue
+                count = self._missing(connection, model, parent, chunk_size, create_missing)
+                if count:
+                    found += count
+                    self.stdout.write(
+                        f"{model._meta.label}: {count} objects without rows in {parent._meta.db_table}"
+                        f"{', created' if create_missing else ''}"
+                    )
+        for part in parts:
+            if not router.allow_migrate_model(database, part):
+                continue
+            delete = part in delete_orphans
+            count = self._orphans(connection, part, chunk_size, delete)
+            if count:
+                found += count
+                self.stdout.write(f"{part._meta.label}: {count} rows without objects{', deleted' if delete else ''}")
+        if not found:
+            self.stdout.write("No missing or orphan rows found.")
+
+    @staticmethod
+    def _models(labels):
+        """The concrete broken-down models selected by ``labels``"""
+        if labels:
+            selected = []
+            for label in labels:
+                try:
+                    if '.' in label:
+                        selected.append(apps.get_model(label))
+                    else:
+                        selected.extend(apps.get_app_config(label).get_models())
+                except LookupError as e:
+                    raise CommandError(str(e)) from None
+        else:
+            selected = apps.get_models()
+        return [
+            model for model in selected
+            if issubclass(model, BrokenDownModel) and not model._meta.proxy and model._meta.managed
+        ]
+
+    @staticmethod
+    def _missing(connection, model, parent, chunk_size, create):
+        """Count, or create, the missing rows of ``parent`` for objects of ``model``"""
+        count = 0
+        # Callable defaults are evaluated once, for all the chunks
+        defaults = populate_part_sql(connection, model, parent)[1] if create else None
+        for condition, params, _ in pk_chunks(connection, model, chunk_size):
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                if create:
+                    sql, _ = populate_part_sql(connection, model, parent, condition, defaults)
+                    cursor.execute(sql, [*defaults, *params])
+                    count += cursor.rowcount
+                else:
+                    cursor.execute(
+                        f"SELECT count(*) {missing_part_rows(connection, model, parent, condition)}", params,
+                    )
+                    count += cursor.fetchone()[0]
+        return count
+
+    @staticmethod
+    def _orphans(connection, part, chunk_size, delete):
+        """Count, or delete, the rows of ``part`` which belong to no object of any of the models sharing it"""
+        qn = connection.ops.quote_name
+        part_table, part_pk = qn(part._meta.db_table), qn(part._meta.pk.column)
+        owners = [
+            model for model in apps.get_models()
+            if not model._meta.proxy and part in model._meta.get_parent_list()
+        ]
+        orphan = " AND ".join(
+            f"NOT EXISTS (SELECT 1 FROM {qn(owner._meta.db_table)} "
+            f"WHERE {qn(owner._meta.db_table)}.{qn(owner._meta.pk.column)} = {part_table}.{part_pk})"
+            for owner in owners
+        )
+        count = 0
+        for condition, params, _ in pk_chunks(connection, part, chunk_size):
+            condition = condition.format(pk=f"{part_table}.{part_pk}")
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                if delete:
+                    cursor.execute(f"DELETE FROM {part_table} WHERE {condition} AND {orphan}", params)
+                    count += cursor.rowcount
+                else:
+                    cursor.execute(f"SELECT count(*) FROM {part_table} WHERE {condition} AND {orphan}", params)
+                    count += cursor.fetchone()[0]
+        return count
@@ -1,9 +1,12 @@
 """
 Migration operations for virtual fields used in broken-down models
 """
-from django.db import migrations
+from django.db import migrations, transaction
+from django.db.models import NOT_PROVIDED
 from django.db.migrations.operations.base import Operation
 
+from .parts import pk_chunks, populate_part_sql
+
 
 # This function is named to look like other migration operations
 # noinspection PyPep8Naming
@@ -25,7 +28,61 @@ def AddVirtualField(*, model_name: str, name: str, field):
     return migrations.SeparateDatabaseAndState(database_operations, state_operations)
 
 
-class CopyDataToPartial(Operation):
+class _ChunkedOperation(Operation):
+    """
+    Base for data operations which can work in chunks of rows, by ranges of primary keys,
+    each chunk in its own transaction. The progress of such an operation is recorded in a
+    checkpoint table, so that when it is interrupted, running it again resumes where it stopped.
+    """
+
+    CHECKPOINT_TABLE = 'bdmodels_migration_checkpoint'
+
+    def __init__(self, chunk_size):
+        if chunk_size is not None and not chunk_size > 0:
+            raise ValueError("chunk_size, if provided, must be positive")
+        self.chunk_size = chunk_size
+        if chunk_size is not None:
+            # Each chunk commits on its own
+            self.atomic = False
+
+    def _run_in_chunks(self, schema_editor, key, model, run):
+        """
+        Call ``run(condition, params)`` for each chunk of the primary keys of ``model``'s table;
+        ``condition`` is an SQL condition on the ``{pk}`` column (to be formatted in), selecting the chunk.
+        If the operation is not chunked, or SQL is being collected rather than executed, this is done once,
+        with a condition selecting all rows.
+        """
+        if self.chunk_size is None or schema_editor.collect_sql:
+            run("1 = 1", [])
+            return
+        connection = schema_editor.connection
+        if schema_editor.atomic_migration or connection.in_atomic_block:
+            # The chunks would all be committed, or rolled back, together with the
+            # transaction; an interrupted migration would start again from the beginning
+            raise ValueError(
+                f"{self.__class__.__name__} with chunk_size must be in a non-atomic migration (atomic = False)"
+            )
+        qn = schema_editor.quote_name
+        pk = model._meta.pk
+        checkpoints = qn(self.CHECKPOINT_TABLE)
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {checkpoints} ("
+            f"{qn('name')} varchar(255) NOT NULL PRIMARY KEY, {qn('last_pk')} varchar(255) NOT NULL)"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {qn('last_pk')} FROM {checkpoints} WHERE {qn('name')} = %s", [key])
+            row = cursor.fetchone()
+        last = None if row is None else pk.to_python(row[0])
+        for condition, params, end in pk_chunks(connection, model, self.chunk_size, last):
+            with transaction.atomic(using=connection.alias):
+                run(condition, params)
+                if end is not None:
+                    schema_editor.execute(f"DELETE FROM {checkpoints} WHERE {qn('name')} = %s", [key])
+                    schema_editor.execute(f"INSERT INTO {checkpoints} VALUES (%s, %s)", [key, str(end)])
+        schema_editor.execute(f"DELETE FROM {checkpoints} WHERE {qn('name')} = %s", [key])
+
+
+class CopyDataToPartial(_ChunkedOperation):
     """
     A migration operation for moving data from a complete model, to a model which has
     some of the complete model's fields, efficiently.
@@ -53,19 +110,33 @@ class CopyDataToPartial(Operation):
         The SQLite documentation reviews `support of this feature in different systems`_, see
         there for details.
 
+    Chunked mode
+        For large tables, copying all the data in one statement, in one transaction, holds
+        locks for a long time and produces a lot of write-ahead log at once. If ``chunk_size``
+        is given, the data is copied in chunks of that many rows, by ranges of primary keys,
+        each in its own transaction; the progress is recorded in a checkpoint table
+        (``bdmodels_migration_checkpoint``), so that if the migration is interrupted, running
+        it again resumes after the last chunk copied. For the chunks to be committed on
+        their own, the migration must be declared non-atomic (``atomic = False``) -- in an
+        atomic migration, the operation raises an error -- and should not include other
+        operations. When the SQL of the migration is only
+        collected (e.g. by :djadmin:`sqlmigrate`), it is shown as a single statement.
+
     .. _`support of this feature in different systems`:
        https://www.sqlite.org/lang_update.html#update_from_in_other_sql_database_engines
     """
 
     atomic = True
 
-    def __init__(self, full_model_name: str, part_model_name: str, elidable: bool = True):
+    def __init__(self, full_model_name: str, part_model_name: str, elidable: bool = True, chunk_size: int = None):
         """
         :param full_model_name: The name of the full model (which at this point has all the fields)
         :param part_model_name: The name of the partial model (whose fields are a PK and some fields
                                 copied from the full model)
         :param elidable: Specifies if this operation can be elided when migrations are squashed
+        :param chunk_size: If given, copy in chunks of this many rows, each in its own transaction
         """
+        super().__init__(chunk_size)
         self.full_model_name = full_model_name
         self.part_model_name = part_model_name
         self.elidable = elidable
@@ -77,6 +148,8 @@ class CopyDataToPartial(Operation):
         }
         if self.elidable is not True:
             kwargs['elidable'] = self.elidable
+        if self.chunk_size is not None:
+            kwargs['chunk_size'] = self.chunk_size
         return (
             self.__class__.__qualname__,
             [],
@@ -93,8 +166,12 @@ class CopyDataToPartial(Operation):
         db = schema_editor.connection.alias
         if self.allow_migrate_model(db, part_model):
             context = self._sql_context(full_model, part_model, non_pks_as_assignments=False, qn=schema_editor.quote_name)
-            sql = self.COPY_FORWARD_SQL.format(**context)
-            schema_editor.execute(sql)
+
+            def copy(condition, params):
+                sql = self.COPY_FORWARD_SQL.format(condition=condition.format(pk=context['full_pk']), **context)
+                schema_editor.execute(sql, params)
+
+            self._run_in_chunks(schema_editor, self._checkpoint_name(app_label, 'forwards'), full_model, copy)
 
     def database_backwards(self, app_label, schema_editor, from_state, to_state):
         full_model = from_state.apps.get_model(app_label, self.full_model_name)
@@ -102,19 +179,27 @@ class CopyDataToPartial(Operation):
         db = schema_editor.connection.alias
         if self.allow_migrate_model(db, full_model):
             context = self._sql_context(full_model, part_model, non_pks_as_assignments=True, qn=schema_editor.quote_name)
-            sql = self.COPY_BACKWARDS_SQL.format(**context)
-            schema_editor.execute(sql)
+
+            def copy(condition, params):
+                sql = self.COPY_BACKWARDS_SQL.format(condition=condition.format(pk=f'"src".{context["part_pk"]}'), **context)
+                schema_editor.execute(sql, params)
+
+            self._run_in_chunks(schema_editor, self._checkpoint_name(app_label, 'backwards'), part_model, copy)
+
+    def _checkpoint_name(self, app_label, direction):
+        return f"{app_label}.{self.full_model_name}.{self.part_model_name}.{direction}".lower()
 
     COPY_FORWARD_SQL = """
     INSERT INTO {part_table} ({part_pk}, {part_non_pks})
     SELECT {full_pk}, {part_non_pks} FROM {full_table}
+    WHERE {condition}
     """
 
     COPY_BACKWARDS_SQL = """
     UPDATE {full_table} as "trg"
     SET {part_non_pk_assignments}
     FROM {part_table} as "src"
-    WHERE "trg".{full_pk} = "src".{part_pk}
+    WHERE "trg".{full_pk} = "src".{part_pk} AND {condition}
     """
 
     @staticmethod
@@ -137,3 +222,629 @@ class CopyDataToPartial(Operation):
 
     def describe(self):
         return "Raw Python operation"
+
+
+class CopyDataToPartials(_ChunkedOperation):
+    """
+    A migration operation for copying data from a complete model to several partial models,
+    reading the complete model's table once.
+
+    This is equivalent to a :py:class:`CopyDataToPartial` operation for each of the partial
+    models; but each of those reads the whole table of the complete model, while this reads
+    each row once and inserts it into all the partial models' tables.
+
+    Implementation
+        On PostgreSQL, each chunk (or the whole table) is copied with a single statement,
+        where the rows selected from the complete model's table are inserted into the
+        partial models' tables in data-modifying ``WITH`` clauses. On other databases,
+        the rows are selected into a temporary table, and inserted from there.
+
+        The backwards side of the operation is that of :py:class:`CopyDataToPartial`,
+        for each of the partial models, with the same compatibility limitations.
+
+    Chunked mode
+        As with :py:class:`CopyDataToPartial`, if ``chunk_size`` is given, the data is
+        copied in chunks of that many rows, each in its own transaction, and an interrupted
+        migration resumes after the last chunk copied.
+    """
+
+    atomic = True
+
+    def __init__(self, full_model_name: str, part_model_names: list, elidable: bool = True, chunk_size: int = None):
+        """
+        :param full_model_name: The name of the full model (which at this point has all the fields)
+        :param part_model_names: The names of the partial models (whose fields are a PK and some fields
+                                 copied from the full model)
+        :param elidable: Specifies if this operation can be elided when migrations are squashed
+        :param chunk_size: If given, copy in chunks of this many rows, each in its own transaction
+        """
+        super().__init__(chunk_size)
+        self.full_model_name = full_model_name
+        self.part_model_names = list(part_model_names)
+        self.elidable = elidable
+
+    def deconstruct(self):
+        kwargs = {
+            'full_model_name': self.full_model_name,
+            'part_model_names': self.part_model_names,
+        }
+        if self.elidable is not True:
+            kwargs['elidable'] = self.elidable
+        if self.chunk_size is not None:
+            kwargs['chunk_size'] = self.chunk_size
+        return (
+            self.__class__.__qualname__,
+            [],
+            kwargs
+        )
+
+    def state_forwards(self, app_label, state):
+        # This operation does not affect state
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        full_model = from_state.apps.get_model(app_label, self.full_model_name)
+        db = schema_editor.connection.alias
+        part_models = [
+            part_model for part_model in (
+                from_state.apps.get_model(app_label, name) for name in self.part_model_names
+            )
+            if self.allow_migrate_model(db, part_model)
+        ]
+        if not part_models:
+            return
+        owners = {}
+        for part_model in part_models:
+            for field in part_model._meta.local_concrete_fields:
+                if not field.primary_key:
+                    if field.column in owners:
+                        raise ValueError(
+                            f"{owners[field.column]._meta.object_name} and {part_model._meta.object_name} "
+                            f"both have the column {field.column}"
+                        )
+                    owners[field.column] = part_model
+        qn = schema_editor.quote_name
+        full_pk = qn(full_model._meta.pk.column)
+
+        def copy(condition, params):
+            (first, *statements), cleanup = self._copy_sql(
+                schema_editor, full_model, part_models, condition.format(pk=full_pk),
+            )
+            schema_editor.execute(first, params)
+            try:
+                for sql in statements:
+                    schema_editor.execute(sql)
+            finally:
+                if cleanup is not None:
+                    schema_editor.execute(cleanup)
+
+        name = f"{app_label}.{self.full_model_name}.{'.'.join(self.part_model_names)}.forwards".lower()
+        self._run_in_chunks(schema_editor, name, full_model, copy)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        for part_model_name in self.part_model_names:
+            CopyDataToPartial(
+                self.full_model_name, part_model_name, chunk_size=self.chunk_size,
+            ).database_backwards(app_label, schema_editor, from_state, to_state)
+
+    STAGING_TABLE = 'bdmodels_staging'
+
+    def _copy_sql(self, schema_editor, full_model, part_models, condition):
+        """
+        The statements copying the rows selected by ``condition`` -- the first of which takes
+        the condition's parameters -- and a statement to run after them, even if they fail
+        (or ``None``)
+        """
+        qn = schema_editor.quote_name
+        full_pk = qn(full_model._meta.pk.column)
+        columns = {
+            part_model: [qn(f.column) for f in part_model._meta.local_concrete_fields if not f.primary_key]
+            for part_model in part_models
+        }
+        all_columns = ", ".join(column for part_columns in columns.values() for column in part_columns)
+        select = f"SELECT {full_pk}, {all_columns} FROM {qn(full_model._meta.db_table)} WHERE {condition}"
+
+        def insert(part_model, source):
+            part_columns = ", ".join(columns[part_model])
+            return (
+                f"INSERT INTO {qn(part_model._meta.db_table)} ({qn(part_model._meta.pk.column)}, {part_columns}) "
+                f"SELECT {full_pk}, {part_columns} FROM {source}"
+            )
+
+        if schema_editor.connection.vendor == 'postgresql':
+            *firsts, last = part_models
+            clauses = [f"bdmodels_source AS ({select})"] + [
+                f"bdmodels_part_{i} AS ({insert(part_model, 'bdmodels_source')})"
+                for i, part_model in enumerate(firsts)
+            ]
+            return [f"WITH {', '.join(clauses)} {insert(last, 'bdmodels_source')}"], None
+        staging = qn(self.STAGING_TABLE)
+        return [
+            f"CREATE TEMPORARY TABLE {staging} AS {select}",
+            *(insert(part_model, staging) for part_model in part_models),
+        ], f"DROP TABLE {staging}"
+
+    def describe(self):
+        return f"Copy data from {self.full_model_name} to {', '.join(self.part_model_names)}"
+
+
+class PartialCopyMismatch(Exception):
+    """
+    Raised by :py:class:`VerifyPartialCopy` when rows of a partial model differ from
+    those of the complete model. The primary keys of the differing rows are in ``pks``.
+    """
+
+    def __init__(self, message, pks):
+        super().__init__(message)
+        self.pks = pks
+
+
+class VerifyPartialCopy(_ChunkedOperation):
+    """
+    A migration operation for verifying that the rows of a partial model are a copy of the
+    rows of the complete model -- that is, that the partial model's table has a row for
+    every row of the complete model's table, with the same primary key and the same
+    values in the partial model's fields, and no other rows. If they differ, it raises
+    :py:class:`PartialCopyMismatch`, stopping the migration.
+
+    This is typically placed after a :py:class:`CopyDataToPartial` operation, before the
+    copied fields are removed from the complete model.
+
+    This is a data operation -- it does not change the schema, and does not write any data.
+    Backwards, it does nothing.
+
+    Implementation
+        Both tables are compared in chunks of ``chunk_size`` rows, by ranges of primary keys.
+        For each chunk, the number of rows and a hash of their contents are computed in the
+        database, in each of the tables; only the chunks where these differ are fetched and
+        compared row by row, to find the differing rows. So the data transferred is in
+        proportion to the differences, rather than to the size of the tables.
+
+    Compatibility
+        Hashes are computed on PostgreSQL and SQLite. On other databases, all the rows
+        are fetched and compared.
+    """
+
+    reduces_to_sql = False
+
+    def __init__(self, full_model_name: str, part_model_name: str, chunk_size: int = 10000, elidable: bool = True):
+        """
+        :param full_model_name: The name of the full model (which at this point has all the fields)
+        :param part_model_name: The name of the partial model (whose fields are a PK and some fields
+                                copied from the full model)
+        :param chunk_size: The number of rows compared at a time
+        :param elidable: Specifies if this operation can be elided when migrations are squashed
+        """
+        if chunk_size is None:
+            raise ValueError("VerifyPartialCopy requires a chunk_size")
+        super().__init__(chunk_size)
+        self.full_model_name = full_model_name
+        self.part_model_name = part_model_name
+        self.elidable = elidable
+
+    def deconstruct(self):
+        kwargs = {
+            'full_model_name': self.full_model_name,
+            'part_model_name': self.part_model_name,
+        }
+        if self.chunk_size != 10000:
+            kwargs['chunk_size'] = self.chunk_size
+        if self.elidable is not True:
+            kwargs['elidable'] = self.elidable
+        return (
+            self.__class__.__qualname__,
+            [],
+            kwargs
+        )
+
+    def state_forwards(self, app_label, state):
+        # This operation does not affect state
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        full_model = from_state.apps.get_model(app_label, self.full_model_name)
+        part_model = from_state.apps.get_model(app_label, self.part_model_name)
+        connection = schema_editor.connection
+        if not (self.allow_migrate_model(connection.alias, full_model)
+                and self.allow_migrate_model(connection.alias, part_model)):
+            return
+        qn = schema_editor.quote_name
+        columns = [qn(f.column) for f in part_model._meta.local_concrete_fields if not f.primary_key]
+        full = (qn(full_model._meta.db_table), qn(full_model._meta.pk.column), columns)
+        part = (qn(part_model._meta.db_table), qn(part_model._meta.pk.column), columns)
+        differing = []
+        for condition, params, _ in pk_chunks(connection, full_model, self.chunk_size):
+            full_digest = self._digest(connection, *full, condition, params)
+            if full_digest is not None and full_digest == self._digest(connection, *part, condition, params):
+                continue
+            full_rows = self._rows(connection, *full, condition, params)
+            part_rows = self._rows(connection, *part, condition, params)
+            differing.extend(sorted(
+                pk for pk in full_rows.keys() | part_rows.keys() if full_rows.get(pk) != part_rows.get(pk)
+            ))
+        if differing:
+            shown = ", ".join(str(pk) for pk in differing[:20])
+            raise PartialCopyMismatch(
+                f"{len(differing)} rows of {self.part_model_name} differ from {self.full_model_name}, "
+                f"with primary keys {shown}{', ...' if len(differing) > 20 else ''}",
+                differing,
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+    @staticmethod
+    def _digest(connection, table, pk, columns, condition, params):
+        """
+        The number of rows in the chunk of ``table`` selected by ``condition``, and a hash of
+        their contents; or ``None``, if hashes are not supported by the database
+        """
+        # Each value is prefixed by its length, so that values cannot run into each other,
+        # and nulls are distinguished from all strings
+        row = " || ".join(
+            f"COALESCE(LENGTH(CAST({column} AS TEXT)) || ':' || CAST({column} AS TEXT), 'n')"
+            for column in [pk, *columns]
+        )
+        where = condition.format(pk=pk)
+        if connection.vendor == 'postgresql':
+            sql = f"SELECT count(*), md5(string_agg(md5({row}), '' ORDER BY {pk})) FROM {table} WHERE {where}"
+        elif connection.vendor == 'sqlite':
+            # The MD5 function is provided by Django's SQLite backend
+            sql = (
+                f'SELECT count(*), MD5(group_concat("row_hash", \'\')) '
+                f'FROM (SELECT MD5({row}) AS "row_hash" FROM {table} WHERE {where} ORDER BY {pk})'
+            )
+        else:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchone()
+
+    @staticmethod
+    def _rows(connection, table, pk, columns, condition, params):
+        """The rows of the chunk of ``table`` selected by ``condition``, as a dict by primary key"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join([pk, *columns])} FROM {table} WHERE {condition.format(pk=pk)}", params
+            )
+            return {row[0]: row[1:] for row in cursor.fetchall()}
+
+    def describe(self):
+        return f"Verify the copy of data from {self.full_model_name} to {self.part_model_name}"
+
+
+class PopulatePart(_ChunkedOperation):
+    """
+    A migration operation for creating the rows of a new part of an existing broken-down model.
+
+    When a part (a parent model) is added to a broken-down model which already has objects,
+    the part's table is empty; this operation creates a row in it for each object that does
+    not have one, holding the defaults of the part's fields. This is done with SQL
+    ``INSERT-SELECT``, rather than creating the rows one at a time.
+
+    As with :py:class:`AddField <django.db.migrations.operations.AddField>`, a callable default
+    is called once, and its value is used for all the rows -- in all chunks, when the rows are
+    created in chunks (a run resumed after a failure calls it again for the remaining rows);
+    fields with ``db_default`` are left for the database to fill.
+
+    If ``chunk_size`` is given, the rows are created in chunks, each in its own transaction; see
+    :py:class:`CopyDataToPartial` for details.
+
+    The operation's backwards side does nothing -- the part's rows are expected to be removed
+    with its table.
+    """
+
+    atomic = True
+
+    def __init__(self, model_name: str, part_model_name: str, elidable: bool = True, chunk_size: int = None):
+        """
+        :param model_name: The name of the broken-down model
+        :param part_model_name: The name of the part model, whose rows are to be created
+        :param elidable: Specifies if this operation can be elided when migrations are squashed
+        :param chunk_size: If given, create the rows in chunks of this many, each in its own transaction
+        """
+        super().__init__(chunk_size)
+        self.model_name = model_name
+        self.part_model_name = part_model_name
+        self.elidable = elidable
+
+    def deconstruct(self):
+        kwargs = {
+            'model_name': self.model_name,
+            'part_model_name': self.part_model_name,
+        }
+        if self.elidable is not True:
+            kwargs['elidable'] = self.elidable
+        if self.chunk_size is not None:
+            kwargs['chunk_size'] = self.chunk_size
+        return (
+            self.__class__.__qualname__,
+            [],
+            kwargs
+        )
+
+    def state_forwards(self, app_label, state):
+        # This operation does not affect state
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        part_model = to_state.apps.get_model(app_label, self.part_model_name)
+        connection = schema_editor.connection
+        if not self.allow_migrate_model(connection.alias, part_model):
+            return
+
+        # Callable defaults are evaluated once, for all the chunks
+        _, defaults = populate_part_sql(connection, model, part_model)
+
+        def populate(condition, params):
+            sql, _ = populate_part_sql(connection, model, part_model, condition, defaults)
+            schema_editor.execute(sql, [*defaults, *params])
+
+        name = f"{app_label}.{self.model_name}.{self.part_model_name}.populate".lower()
+        self._run_in_chunks(schema_editor, name, model, populate)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+    def describe(self):
+        return f"Create the rows of {self.part_model_name} for the existing {self.model_name} objects"
+
+
+class MoveFieldsBetweenParts(_ChunkedOperation):
+    """
+    A migration operation for moving fields between two models which share the primary key
+    of a broken-down model -- two of its parts, or a part and the broken-down model itself.
+
+    The operation adds the fields to the target model, copies their values from the rows
+    of the source model with the same primary keys, and then removes the fields from the
+    source model. The copy uses ``UPDATE`` with a join, as the backwards side of
+    :py:class:`CopyDataToPartial` does, with the same compatibility limitations. Every row
+    of the source model must have a row of the target model -- otherwise its values would
+    be lost; this is checked before the fields are added, and again before they are removed
+    from the source model, and the operation raises an error if any rows are missing.
+    Missing rows of a part (e.g. a :ref:`sparse <sparse_parts>` one) can be created
+    first with :py:class:`PopulatePart`.
+
+    Fields which are not nullable and have no default are added as nullable, and made
+    non-nullable after the copy.
+
+    If ``chunk_size`` is given, the values are copied in chunks, each in its own transaction;
+    see :py:class:`CopyDataToPartial` for details. When an interrupted move is run again,
+    fields already added to the target model are not added again.
+
+    The operation is reversible; backwards, it moves the fields back.
+    """
+
+    atomic = True
+
+    def __init__(self, from_model_name: str, to_model_name: str, field_names: list,
+                 elidable: bool = False, chunk_size: int = None):
+        """
+        :param from_model_name: The name of the model which has the fields
+        :param to_model_name: The name of the model the fields are moved to
+        :param field_names: The names of the fields to move
+        :param elidable: Specifies if this operation can be elided when migrations are squashed
+        :param chunk_size: If given, copy in chunks of this many rows, each in its own transaction
+        """
+        super().__init__(chunk_size)
+        self.from_model_name = from_model_name
+        self.to_model_name = to_model_name
+        self.field_names = list(field_names)
+        self.elidable = elidable
+
+    def deconstruct(self):
+        kwargs = {
+            'from_model_name': self.from_model_name,
+            'to_model_name': self.to_model_name,
+            'field_names': self.field_names,
+        }
+        if self.elidable is not False:
+            kwargs['elidable'] = self.elidable
+        if self.chunk_size is not None:
+            kwargs['chunk_size'] = self.chunk_size
+        return (
+            self.__class__.__qualname__,
+            [],
+            kwargs
+        )
+
+    def state_forwards(self, app_label, state):
+        fields = state.models[app_label, self.from_model_name.lower()].fields
+        moved = [(name, fields[name].clone()) for name in self.field_names]
+        # Removed first, so that the fields never clash
+        for name, field in moved:
+            state.remove_field(app_label, self.from_model_name.lower(), name)
+        for name, field in moved:
+            state.add_field(app_label, self.to_model_name.lower(), name, field, preserve_default=True)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._move(app_label, schema_editor, self.from_model_name, self.to_model_name, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._move(app_label, schema_editor, self.to_model_name, self.from_model_name, from_state, to_state)
+
+    def _move(self, app_label, schema_editor, source_name, target_name, source_state, target_state):
+        """
+        Move the fields from the model named ``source_name`` in ``source_state``
+        to the model named ``target_name`` in ``target_state``
+        """
+        source = source_state.apps.get_model(app_label, source_name)
+        target = target_state.apps.get_model(app_label, target_name)
+        db = schema_editor.connection.alias
+        if not (self.allow_migrate_model(db, source) and self.allow_migrate_model(db, target)):
+            return
+        connection = schema_editor.connection
+        qn = schema_editor.quote_name
+        source_table, target_table = qn(source._meta.db_table), qn(target._meta.db_table)
+        source_pk = f'"src".{qn(source._meta.pk.column)}'
+        unmatched_sql = (
+            f'SELECT count(*) FROM {source_table} AS "src" WHERE NOT EXISTS '
+            f'(SELECT 1 FROM {target_table} WHERE {target_table}.{qn(target._meta.pk.column)} = {source_pk})'
+        )
+
+        def check_matched():
+            # The values of rows without a row in the target would be lost
+            if schema_editor.collect_sql:
+                return
+            with connection.cursor() as cursor:
+                cursor.execute(unmatched_sql)
+                unmatched = cursor.fetchone()[0]
+            if unmatched:
+                raise ValueError(
+                    f"{unmatched} rows of {source_name} have no rows of {target_name} to move fields to; "
+                    f"create them first (e.g. with PopulatePart)"
+                )
+
+        check_matched()
+        with connection.cursor() as cursor:
+            existing = {
+                column.name for column in connection.introspection.get_table_description(cursor, target._meta.db_table)
+            }
+        fields = [target._meta.get_field(name) for name in self.field_names]
+        not_nullable = []
+        for field in fields:
+            if field.null or field.has_default() or getattr(field, 'db_default', NOT_PROVIDED) is not NOT_PROVIDED:
+                added = field
+            else:
+                # Added nullable, as the existing rows get their values only by the copy
+                added = field.clone()
+                added.null = True
+                added.set_attributes_from_name(field.name)
+                added.model = target
+                not_nullable.append((added, field))
+            # When resuming an interrupted move, the fields were already added
+            if field.column not in existing:
+                schema_editor.add_field(target, added)
+
+        assignments = ", ".join(f'{qn(field.column)} = "src".{qn(field.column)}' for field in fields)
+
+        def copy(condition, params):
+            schema_editor.execute(
+                f'UPDATE {target_table} AS "trg" SET {assignments} '
+                f'FROM {source_table} AS "src" '
+                f'WHERE "trg".{qn(target._meta.pk.column)} = {source_pk} AND {condition.format(pk=source_pk)}',
+                params,
+            )
+
+        name = f"{app_label}.{source_name}.{target_name}.{'.'.join(self.field_names)}.move".lower()
+        self._run_in_chunks(schema_editor, name, source, copy)
+        for nullable, field in not_nullable:
+            schema_editor.alter_field(target, nullable, field)
+        check_matched()
+        for name in self.field_names:
+            schema_editor.remove_field(source, source._meta.get_field(name))
+
+    def describe(self):
+        return f"Move fields {', '.join(self.field_names)} from {self.from_model_name} to {self.to_model_name}"
+
+
+class ReclaimSpace(_ChunkedOperation):
+    """
+    A migration operation for reclaiming the space of columns removed from a model's table.
+
+    After fields are copied to partial models and removed from the complete model,
+    the table of the complete model does not become smaller by itself: PostgreSQL only
+    marks the removed columns as dropped, leaving their data in the rows, and SQLite keeps
+    the pages freed in the database file. Until the table is rewritten, reading it costs
+    as much as before the model was broken down. This operation, placed after the
+    :py:class:`RemoveField <django.db.migrations.operations.RemoveField>` operations,
+    rewrites or compacts the table.
+
+    Implementation
+        On PostgreSQL, the table is rewritten by ``VACUUM FULL``, or, with ``cluster=True``,
+        by ``CLUSTER`` on its primary key index, which also orders the rows by primary key.
+        Both hold an exclusive lock on the table while it is rewritten. On SQLite, the whole
+        database is rebuilt by ``VACUUM``. On MySQL, the table is rebuilt by ``OPTIMIZE TABLE``.
+        On other databases, the operation does nothing.
+
+        None of these can run in a transaction, so the operation must be in a migration
+        declared non-atomic (``atomic = False``).
+
+    Lock-tolerant mode
+        With ``lock_tolerant=True``, on PostgreSQL, the rows are rewritten by updates which
+        do not change them, in chunks of ``chunk_size`` rows, each in its own transaction --
+        as :py:class:`CopyDataToPartial` copies in chunked mode, including resuming when
+        interrupted -- followed by a plain ``VACUUM`` of the table. This only locks the rows
+        of one chunk at a time, so the table stays available for reads and writes; the space
+        is made free for new rows in the table, but the table's file is not shrunk.
+        On SQLite, the mode runs ``PRAGMA incremental_vacuum``, which only has an effect
+        if the database uses incremental auto-vacuum. Other databases are not affected.
+
+    The operation has no backwards effect.
+    """
+
+    atomic = False
+
+    def __init__(self, model_name: str, cluster: bool = False, lock_tolerant: bool = False,
+                 chunk_size: int = 10000, elidable: bool = True):
+        """
+        :param model_name: The name of the model whose table is to be compacted
+        :param cluster: On PostgreSQL, rewrite the table with ``CLUSTER`` rather than ``VACUUM FULL``
+        :param lock_tolerant: Avoid locking the whole table; see above
+        :param chunk_size: In lock-tolerant mode, the number of rows rewritten in each transaction
+        :param elidable: Specifies if this operation can be elided when migrations are squashed
+        """
+        if cluster and lock_tolerant:
+            raise ValueError("cluster and lock_tolerant cannot be used together")
+        super().__init__(chunk_size)
+        self.model_name = model_name
+        self.cluster = cluster
+        self.lock_tolerant = lock_tolerant
+        self.elidable = elidable
+
+    def deconstruct(self):
+        kwargs = {
+            'model_name': self.model_name,
+        }
+        if self.cluster:
+            kwargs['cluster'] = self.cluster
+        if self.lock_tolerant:
+            kwargs['lock_tolerant'] = self.lock_tolerant
+        if self.chunk_size != 10000:
+            kwargs['chunk_size'] = self.chunk_size
+        if self.elidable is not True:
+            kwargs['elidable'] = self.elidable
+        return (
+            self.__class__.__qualname__,
+            [],
+            kwargs
+        )
+
+    def state_forwards(self, app_label, state):
+        # This operation does not affect state
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        connection = schema_editor.connection
+        if not self.allow_migrate_model(connection.alias, model):
+            return
+        qn = schema_editor.quote_name
+        table = qn(model._meta.db_table)
+        if connection.vendor == 'postgresql':
+            if self.lock_tolerant:
+                pk = qn(model._meta.pk.column)
+
+                def rewrite(condition, params):
+                    schema_editor.execute(f"UPDATE {table} SET {pk} = {pk} WHERE {condition.format(pk=pk)}", params)
+
+                self._run_in_chunks(schema_editor, f"{app_label}.{self.model_name}.reclaim".lower(), model, rewrite)
+                schema_editor.execute(f"VACUUM {table}")
+            elif self.cluster:
+                with connection.cursor() as cursor:
+                    constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+                index = next(name for name, info in constraints.items() if info['primary_key'])
+                schema_editor.execute(f"CLUSTER {table} USING {qn(index)}")
+            else:
+                schema_editor.execute(f"VACUUM FULL {table}")
+        elif connection.vendor == 'sqlite':
+            schema_editor.execute("PRAGMA incremental_vacuum" if self.lock_tolerant else "VACUUM")
+        elif connection.vendor == 'mysql' and not self.lock_tolerant:
+            schema_editor.execute(f"OPTIMIZE TABLE {table}")
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+    def describe(self):
+        return f"Reclaim the space of removed columns in the table of {self.model_name}"
@@ -1,14 +1,26 @@
+import copy
+import graphlib
 import itertools
 import warnings
+import weakref
 
 import django
 from django.core import checks
 from django.core.exceptions import FieldDoesNotExist
-from django.db import models, connections, transaction
-from django.db.models import constants
+from django.db import models, connections, router, transaction
+from django.db.models import constants, signals as model_signals
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.db.models.expressions import Case, Col, RawSQL, Value, When
+from django.db.models.functions import Cast
 from django.db.models.options import Options
+from django.db.models.query import ModelIterable
+from django.db.models.sql.query import Query
+from django.db.models.sql.subqueries import InsertQuery
+from django.db.models.sql.where import ExtraWhere
 from django.utils.functional import cached_property, partition
 
+from . import adaptive, signals, unitofwork
+
 
 def get_field_names_to_fetch(model_set):
     fetched_fields = itertools.chain.from_iterable(
@@ -18,6 +30,171 @@ def get_field_names_to_fetch(model_set):
     return fetched_field_names
 
 
+def _snapshot(value):
+    """A copy of a field value, to compare with later; only mutable containers are actually copied"""
+    return copy.deepcopy(value) if isinstance(value, (dict, list, set, bytearray)) else value
+
+
+def _holds_defaults(instance, parent):
+    """Are all the fields of ``parent`` which are set on ``instance`` at their defaults?"""
+    return all(
+        field.attname not in instance.__dict__ or getattr(instance, field.attname) == field.get_default()
+        for field in parent._meta.local_concrete_fields if not field.primary_key
+    )
+
+
+def _filtered_models(node):
+    """
+    The concrete models whose columns are referred to by a filter condition
+    (or part of it); ``None`` if this cannot be told, e.g. for raw SQL or subqueries
+    """
+    if isinstance(node, Col):
+        return {node.target.model._meta.concrete_model}
+    if isinstance(node, (Query, RawSQL, ExtraWhere)) or getattr(node, 'subquery', False):
+        return None
+    if hasattr(node, 'children'):
+        children = node.children
+    elif hasattr(node, 'get_source_expressions'):
+        children = node.get_source_expressions()
+    else:
+        return set()
+    models_ = set()
+    for child in children:
+        child_models = _filtered_models(child)
+        if child_models is None:
+            return None
+        models_ |= child_models
+    return models_
+
+
+def _can_fast_delete(model, parents):
+    """
+    Can objects of ``model`` be deleted, together with their rows in the tables of ``parents``,
+    with plain ``DELETE`` statements -- no signals to send, nothing else to delete or update?
+    """
+    concrete_model = model._meta.concrete_model
+    links = set(concrete_model._meta.parents.values())
+    for deleted in {model, concrete_model, *parents}:
+        if model_signals.pre_delete.has_listeners(deleted) or model_signals.post_delete.has_listeners(deleted):
+            return False
+        opts = deleted._meta
+        if any(hasattr(field, 'bulk_related_objects') for field in opts.private_fields):
+            return False
+        for related in get_candidate_relations_to_delete(opts):
+            # Our own parent links are taken care of by deleting all the parts
+            if related.field not in links and related.field.remote_field.on_delete is not models.DO_NOTHING:
+                return False
+    return True
+
+
+def _can_update_from(connection):
+    """Does the database support ``UPDATE ... FROM`` (in the PostgreSQL syntax)?"""
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 33)
+    return False
+
+
+def _changed_by_update(field, instance):
+    """Does saving ``instance``, an existing object, change the value of ``field`` (e.g. ``auto_now``)?"""
+    if isinstance(field, models.FileField):
+        # A newly assigned file is stored, and given its final name, when the object is saved
+        file = getattr(instance, field.attname)
+        return bool(file) and not file._committed
+    # auto_now_add only applies to new objects
+    return getattr(field, 'auto_now', False)
+
+
+class _FetchGroup:
+    """
+    The set of instances fetched together by one evaluation of a queryset.
+
+    Instances only refer to their siblings weakly, so that keeping one of them
+    around does not keep the whole result set alive.
+    """
+
+    def __init__(self, instances, *, batch=False, origin=None, profile=None):
+        self._refs = [weakref.ref(instance) for instance in instances]
+        self.batch = batch
+        self.origin = origin
+        self.profile = profile
+        self._loaded_parents = set()
+
+    def __iter__(self):
+        for ref in self._refs:
+            instance = ref()
+            if instance is not None:
+                yield instance
+
+    def __reduce__(self):
+        # Copied or pickled instances are detached from their siblings
+        return self.__class__, ((),)
+
+    def parents_loaded(self, parents, using):
+        """
+        Called when ``parents`` are loaded lazily for one of the instances.
+
+        Record this in the profile, if there is one; and if batching, load the
+        parents for all the siblings which do not have them yet, in a single query.
+        """
+        for parent in parents:
+            if self.profile is not None and parent not in self._loaded_parents:
+                self.profile.record_load(self.origin, parent._meta.label)
+            self._loaded_parents.add(parent)
+            if self.batch:
+                fetch_parent_fields(list(self), parent, using)
+
+
+def fetch_parent_fields(instances, parent, using):
+    """
+    Load the fields of ``parent`` into those of ``instances`` which do not have
+    them yet, with a ``pk__in`` query on the parent's table (batched as required
+    by the backend).
+    """
+    fields = parent._meta.local_concrete_fields
+    pending = [
+        instance for instance in instances
+        if not all(f.attname in instance.__dict__ for f in fields)
+    ]
+    if not pending:
+        return
+    link = pending[0]._concrete_meta.parents[parent]
+    hints = {"instance": pending[0]}
+    queryset = parent._base_manager.db_manager(using, hints=hints)
+    connection = connections[queryset.db]
+    batch_size = max(connection.ops.bulk_batch_size(['pk'], pending), 1)
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        loaded = queryset.in_bulk([getattr(instance, link.attname) for instance in batch])
+        for instance in batch:
+            db_instance = loaded.get(getattr(instance, link.attname))
+            if db_instance is not None:
+                _copy_loaded_fields(
+                    instance, db_instance, [f for f in fields if f.attname not in instance.__dict__]
+                )
+            elif getattr(link, 'sparse', False):
+                instance._set_missing_part(parent, [f for f in fields if f.attname not in instance.__dict__])
+
+
+def _copy_loaded_fields(instance, db_instance, fields):
+    """
+    Set on ``instance`` the values of ``fields`` from ``db_instance``, the way
+    ``refresh_from_db()`` does.
+    """
+    for field in fields:
+        setattr(instance, field.attname, getattr(db_instance, field.attname))
+        # Clear or copy cached foreign keys.
+        if field.is_relation:
+            if field.is_cached(db_instance):
+                field.set_cached_value(instance, field.get_cached_value(db_instance))
+            elif field.is_cached(instance):
+                field.delete_cached_value(instance)
+    instance._state.db = db_instance._state.db
+    if instance.track_changes:
+        instance._record_loaded_values(fields)
+
+
 class BrokenDownQuerySet(models.QuerySet):
     """
     Special queryset for use with broken-down models.
@@ -32,13 +209,77 @@ class BrokenDownQuerySet(models.QuerySet):
         super().__init__(*args, **kwargs)
         self._with_parents = frozenset()
         self._with_virtuals = frozenset()
+        self._prefetch_parents = frozenset()
+        self._batch_parents = False
+        self._adaptive = None
 
     def _clone(self):
         c = super()._clone()
         c._with_parents = self._with_parents
         c._with_virtuals = self._with_virtuals
+        c._prefetch_parents = self._prefetch_parents
+        c._batch_parents = self._batch_parents
+        c._adaptive = self._adaptive
         return c
 
+    def _fetch_all(self):
+        fetching = self._result_cache is None
+        origin = profile = None
+        fetcher = self
+        if fetching and self._adaptive is not None and issubclass(self._iterable_class, ModelIterable):
+            origin, profile, join = self._adaptive
+            origin = origin or adaptive.call_site()
+            fetcher, selected = self._apply_profile(profile.parents_to_fetch(origin), join)
+        if fetcher is self:
+            super()._fetch_all()
+        else:
+            # The results are fetched by a copy with the profile applied, leaving this queryset as it was
+            super(BrokenDownQuerySet, fetcher)._fetch_all()
+            self._result_cache = fetcher._result_cache
+            self._prefetch_done = fetcher._prefetch_done
+        if not (fetching and self._result_cache and issubclass(self._iterable_class, ModelIterable)):
+            return
+        if profile is not None:
+            profile.record_fetch(origin, selected)
+        for parent in fetcher._prefetch_parents:
+            fetch_parent_fields(self._result_cache, parent, self.db)
+        if profile is not None or (
+            len(self._result_cache) > 1
+            and (self._batch_parents or signals.parts_loaded.has_listeners(self.model))
+        ):
+            group = _FetchGroup(self._result_cache, batch=self._batch_parents, origin=origin, profile=profile)
+            for obj in self._result_cache:
+                obj._state.fetch_group = group
+
+    def _iterator(self, use_chunked_fetch, chunk_size):
+        iterator = super()._iterator(use_chunked_fetch, chunk_size)
+        if not (self._prefetch_parents and issubclass(self._iterable_class, ModelIterable)):
+            yield from iterator
+            return
+        # As iterator() does for prefetch_related(), the parents are prefetched for each chunk
+        while results := list(itertools.islice(iterator, chunk_size or 2000)):
+            for parent in self._prefetch_parents:
+                fetch_parent_fields(results, parent, self.db)
+            yield from results
+
+    def _apply_profile(self, labels, join):
+        """
+        Return a copy of this queryset which also fetches the parents with the given labels
+        (or the queryset itself, if it already fetches all of them), and the labels of the
+        parents added
+        """
+        selected = {
+            parent for parent in self._concrete_model._meta.parents
+            if parent._meta.label in labels
+        } - self._with_parents - self._prefetch_parents
+        if not selected:
+            return self, []
+        if join:
+            updated = self.update_fetched_parents(self._with_parents | selected, self._with_virtuals)
+        else:
+            updated = self.prefetch_parents(*selected)
+        return updated, [parent._meta.label for parent in selected]
+
     @property
     def _concrete_model(self):
         return self.model._meta.concrete_model
@@ -105,6 +346,8 @@ class BrokenDownQuerySet(models.QuerySet):
         updated = self.only(*fetched_field_names, *(field.name for field in virtual_fields))
         updated._with_parents = frozenset(parent_set)
         updated._with_virtuals = frozenset(virtual_fields)
+        # Parents which are joined need not be prefetched
+        updated._prefetch_parents = self._prefetch_parents - updated._with_parents
         return updated
     update_fetched_parents.queryset_only = True
 
@@ -125,8 +368,93 @@ class BrokenDownQuerySet(models.QuerySet):
         """
         updated = self.defer(None)
         updated._with_parents = frozenset(self.model._meta.parents.keys())
+        updated._prefetch_parents = frozenset()
+        return updated
+
+    def prefetch_parents(self, *parents):
+        """
+        Fetch parents with separate queries, rather than joining them into the main query.
+
+        This is to parents what :py:meth:`prefetch_related()
+        <django.db.models.query.QuerySet.prefetch_related>` is to related objects:
+        When the queryset is evaluated, after the main query, one more query is made
+        for each of the given parents, fetching its fields for all the objects.
+
+        Parents may be given as models or as the names of their parent-link fields.
+        With no arguments, all the parents are prefetched. As with ``prefetch_related()``,
+        passing ``None`` clears the set of parents to prefetch.
+
+        Parents named here are not joined into the main query, even if they were
+        previously set to be by :py:meth:`select_related()`; conversely, a later
+        call to :py:meth:`select_related()` or :py:meth:`fetch_all_parents()`
+        for a parent cancels its prefetching.
+
+        With :py:meth:`iterator() <django.db.models.query.QuerySet.iterator>`, the parents are
+        prefetched for each chunk of ``chunk_size`` objects (2000 if it is not given).
+        """
+        if parents == (None,):
+            clone = self._chain()
+            clone._prefetch_parents = frozenset()
+            return clone
+        parent_links = self._concrete_model._meta.parents
+        if parents:
+            ptr_names = {link.name: parent for parent, link in parent_links.items()}
+            prefetched = set()
+            for parent in parents:
+                if isinstance(parent, str):
+                    try:
+                        parent = ptr_names[parent]
+                    except KeyError:
+                        raise ValueError(f"'{parent}' is not a parent link of {self.model._meta.label}") from None
+                elif parent._meta.concrete_model not in parent_links:
+                    raise ValueError(f"{parent._meta.label} is not a parent of {self.model._meta.label}")
+                prefetched.add(parent._meta.concrete_model)
+        else:
+            prefetched = set(parent_links)
+        updated = self.update_fetched_parents(self._with_parents - prefetched, self._with_virtuals)
+        if updated is self:
+            updated = self._chain()
+        updated._prefetch_parents = self._prefetch_parents | prefetched
         return updated
 
+    def batch_fetch_parents(self, enabled: bool = True):
+        """
+        Make deferred parents load for all the fetched objects together.
+
+        Normally, accessing a deferred parent field of an object fetches that
+        parent for this object only; iterating over the results of a query and
+        accessing such a field on every object makes one query per object.
+        With this option, the objects fetched by the queryset remember each other,
+        and the first access to a deferred parent field on any of them fetches
+        that parent for all of them, in a single query.
+
+        This only applies to objects fetched by evaluating the queryset in full --
+        not to objects fetched with :py:meth:`iterator()
+        <django.db.models.query.QuerySet.iterator>`.
+        """
+        clone = self._chain()
+        clone._batch_parents = enabled
+        return clone
+
+    def adaptive_parents(self, origin: str = None, *, join: bool = False, profile=None):
+        """
+        Select the parents to fetch according to a profile of past use.
+
+        The queryset reports to the profile which parents end up being loaded lazily
+        for the objects it fetched; when it is evaluated, it fetches up front the parents
+        that the profile selects for its origin -- by default with :py:meth:`prefetch_parents`,
+        or, if ``join`` is true, by joining them into the query.
+
+        :param origin: A name for the origin of the queryset; by default, the place in the
+                       code where the queryset is evaluated
+        :param join: If true, join the selected parents rather than prefetch them
+        :param profile: The :py:class:`ParentUsageProfile <bdmodels.adaptive.ParentUsageProfile>`
+                        to use; by default, ``bdmodels.adaptive.default_profile``
+        """
+        clone = self._chain()
+        clone._adaptive = (origin, profile or adaptive.default_profile, join)
+        return clone
+
     def bulk_create(
             self, objs, batch_size=None, ignore_conflicts=False,
             update_conflicts=False, update_fields=None, unique_fields=None
@@ -138,11 +466,21 @@ class BrokenDownQuerySet(models.QuerySet):
 
         Setting the primary key attribute, if it is not set, is required for broken-down
         models; so if the PK is an autoincrement field, the database feature
-        ``can_return_rows_from_bulk_insert`` is required.
-
-        The parameters ``update_conflicts``, ``update_fields`` and ``unique_fields``
-        are present in order to match the API of Django>=4.1, but updating on conflicts
-        in bulk creation is currently not supported.
+        ``can_return_rows_from_bulk_insert`` is required -- unless the model has a
+        :py:attr:`pk_allocator <BrokenDownModel.pk_allocator>`, which sets the PKs
+        in advance.
+
+        Updating on conflicts (``update_conflicts=True``) is supported with some limitations:
+        The conflicts are detected on the model's own table, so ``unique_fields`` must be
+        fields of that table; each of the ``update_fields`` is updated in the table of the
+        part it belongs to, where conflicts are detected on the shared primary key. Unless
+        ``unique_fields`` is just the primary key, the objects must not have their primary
+        keys set -- these are taken from the rows inserted or updated, which requires
+        Django>=5.0.
+
+        When ignoring conflicts (``ignore_conflicts=True``), the rows of the parts are only
+        inserted for objects whose own row was inserted; the parts of existing objects are
+        left alone.
         """
         # Of importance: Broken-down models do the funny reverse thing where
         # the parents inherit their PK value from the child. So we only need
@@ -152,67 +490,493 @@ class BrokenDownQuerySet(models.QuerySet):
             raise ValueError("bulk_create batch size, if provided, must be positive")
         if not objs:
             return objs
+        # Drop proxies, use the concrete model
+        model = self.model._meta.concrete_model
+        meta = model._meta
+        if unique_fields:
+            unique_fields = [meta.get_field(meta.pk.name if name == 'pk' else name) for name in unique_fields]
+        if update_fields:
+            update_fields = [meta.get_field(name) for name in update_fields]
         on_conflict = self._check_bulk_create_options(
             ignore_conflicts, update_conflicts, update_fields, unique_fields,
         )
         objs = list(objs)
         self._prepare_for_bulk_create(objs)
-        # Drop proxies, use the concrete model
-        model = self.model._meta.concrete_model
-        meta = model._meta
         self._for_write = True
         connection = connections[self.db]
+        upsert = on_conflict == constants.OnConflict.UPDATE
+        keyed_on_pk = not unique_fields or unique_fields == [meta.pk]
+        allocator = self.model.pk_allocator
+        if allocator is not None and (keyed_on_pk or not upsert):
+            objs_to_allocate = [obj for obj in objs if obj.pk is None]
+            if objs_to_allocate:
+                pks = allocator.allocate(model, len(objs_to_allocate), self.db)
+                for obj, pk in zip(objs_to_allocate, pks):
+                    obj.pk = pk
         objs_with_pk, objs_without_pk = partition(lambda o: o.pk is None, objs)
         if objs_without_pk and not connection.features.can_return_rows_from_bulk_insert:
             raise ValueError(f"On {connection.vendor} bulk_create for broken-down models requires that PKs be set")
+        if upsert and objs_with_pk and not keyed_on_pk:
+            raise ValueError(
+                "bulk_create() of broken-down models updating on conflicts of fields other than "
+                "the primary key requires that PKs not be set"
+            )
+        if upsert and objs_without_pk and django.VERSION < (5, 0):
+            raise ValueError(
+                "bulk_create() of broken-down models updating on conflicts requires that PKs be set"
+            )
         with transaction.atomic(using=self.db, savepoint=False):
             # Start with the BDModel child
             fields = meta.local_concrete_fields
-            if objs_with_pk:
-                # Note: calls to self._batched_insert() explicitly avoid naming the last argument,
-                # this way, with the support of our special _check_bulk_create_options() method,
-                # is compatible with both django<4.1 and django>=4.1 (under the limitation that
-                # update-on-conflict is not supported at all)
-                returned_columns = self._batched_insert(objs_with_pk, fields, batch_size, on_conflict)
-                self._set_fields_from_returned_columns(objs_with_pk, returned_columns, meta, set_pk=False)
-            if objs_without_pk:
-                fields = [f for f in fields if not isinstance(f, models.AutoField)]
-                returned_columns = self._batched_insert(objs_without_pk, fields, batch_size, on_conflict)
-                if connection.features.can_return_rows_from_bulk_insert and not ignore_conflicts:
-                    assert len(returned_columns) == len(objs_without_pk)
-                self._set_fields_from_returned_columns(objs_without_pk, returned_columns, meta, set_pk=True)
+            fields_without_auto = [f for f in fields if not isinstance(f, models.AutoField)]
+            if ignore_conflicts:
+                # Only the objects actually inserted get parent rows
+                inserted = [
+                    *self._insert_new(objs_with_pk, fields, batch_size),
+                    *self._insert_new(objs_without_pk, fields_without_auto, batch_size),
+                ]
+            else:
+                core_update_fields = [f for f in update_fields if f in fields] if upsert else None
+                if upsert and not core_update_fields and not keyed_on_pk:
+                    # A no-op update, so that the ids of the conflicting rows are returned
+                    core_update_fields = unique_fields
+                if objs_with_pk:
+                    if upsert and not core_update_fields:
+                        returned_columns = self._batched_insert(
+                            objs_with_pk, fields, batch_size, constants.OnConflict.IGNORE,
+                        )
+                    else:
+                        returned_columns = self._batched_insert(
+                            objs_with_pk, fields, batch_size, on_conflict, core_update_fields, unique_fields,
+                        )
+                    self._set_fields_from_returned_columns(objs_with_pk, returned_columns, meta, set_pk=False)
+                if objs_without_pk:
+                    if upsert and not core_update_fields:
+                        # Conflicts on new PKs are not possible
+                        returned_columns = self._batched_insert(objs_without_pk, fields_without_auto, batch_size)
+                    else:
+                        returned_columns = self._batched_insert(
+                            objs_without_pk, fields_without_auto, batch_size,
+                            on_conflict, core_update_fields, unique_fields,
+                        )
+                    if connection.features.can_return_rows_from_bulk_insert:
+                        assert len(returned_columns) == len(objs_without_pk)
+                    self._set_fields_from_returned_columns(objs_without_pk, returned_columns, meta, set_pk=True)
+                inserted = objs
             # Now everyone has PKs, we can proceed with objs
             for parent, field in meta.parents.items():
                 # Make sure the link fields are synced with parent.
                 if field:
-                    self._sync_parent_pks_to_pk(objs, parent)
-                    parent._base_manager.get_queryset()._batched_insert(
-                        objs, parent._meta.local_concrete_fields, batch_size, on_conflict
-                    )
+                    self._insert_parent(parent, field, inserted, batch_size, on_conflict, update_fields)
             for obj in objs:
                 obj._state.adding = False
                 obj._state.db = self.db
         return objs
 
-    def _check_bulk_create_options(
-        self, ignore_conflicts, update_conflicts, update_fields, unique_fields
+    def bulk_create_iter(
+            self, objs, batch_size=1000, ignore_conflicts=False,
+            update_conflicts=False, update_fields=None, unique_fields=None, progress=None,
     ):
-        # update_conflicts and related fields not supported by this implementation
-        if update_conflicts or update_fields or unique_fields:
-            raise NotImplementedError(
-                "updating on conflict in bulk_create() is not supported for broken-down models."
+        """
+        Like :py:meth:`bulk_create`, but consume ``objs`` as an iterable, one batch at a time.
+
+        Each batch of ``batch_size`` objects is inserted -- with all of its parts -- by a
+        call to :py:meth:`bulk_create`, and then released; so ``objs`` can be a generator
+        of any length, and memory use is bounded by the batch size. Each batch is inserted
+        in its own transaction, unless the call is made in an enclosing one.
+
+        :param progress: If given, called after each batch with the number of objects taken from ``objs`` so far
+        :return: The number of objects taken from ``objs``
+        """
+        if not batch_size > 0:
+            raise ValueError("bulk_create_iter batch size must be positive")
+        objs = iter(objs)
+        count = 0
+        while batch := list(itertools.islice(objs, batch_size)):
+            self.bulk_create(
+                batch, batch_size, ignore_conflicts, update_conflicts, update_fields, unique_fields,
+            )
+            count += len(batch)
+            del batch
+            if progress is not None:
+                progress(count)
+        return count
+
+    def _insert_new(self, objs, fields, batch_size):
+        """
+        Insert ``objs`` into our own table, ignoring conflicts, and return those which
+        were actually inserted (setting the PKs of those which did not have them).
+        """
+        if not objs:
+            return []
+        connection = connections[self.db]
+        ignore = constants.OnConflict.IGNORE
+        max_batch_size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+        batch_size = min(batch_size, max_batch_size) if batch_size else max_batch_size
+        inserted = []
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            if connection.features.can_return_rows_from_bulk_insert:
+                # RETURNING gives the rows inserted, skipping the conflicts
+                inserted.extend(self._insert_returning(batch, fields))
+            else:
+                # Objects must have PKs here; see which rows were added
+                rows = self._concrete_model._base_manager.using(self.db).filter(pk__in=[obj.pk for obj in batch])
+                existing = set(rows.values_list('pk', flat=True))
+                self._insert(batch, fields=fields, using=self.db, on_conflict=ignore)
+                added = set(rows.values_list('pk', flat=True)) - existing
+                inserted.extend(obj for obj in batch if obj.pk in added)
+        return inserted
+
+    def _insert_returning(self, batch, fields):
+        meta = self._concrete_model._meta
+
+        def insert(objs):
+            returned = self._insert(
+                objs, fields=fields, using=self.db, on_conflict=constants.OnConflict.IGNORE,
+                returning_fields=[meta.pk],
             )
-        elif ignore_conflicts:
-            # The value returned from this function is passed on to self._batched_insert()
-            return constants.OnConflict.IGNORE
+            return [row[0] for row in returned if row is not None]
+
+        if batch[0].pk is not None:
+            pks = set(insert(batch))
+            return [obj for obj in batch if obj.pk in pks]
+        savepoint = transaction.savepoint(using=self.db)
+        pks = insert(batch)
+        if len(pks) == len(batch):
+            transaction.savepoint_commit(savepoint, using=self.db)
+            inserted = batch
+        else:
+            # Some rows were skipped, and we cannot tell which; insert one at a time instead
+            transaction.savepoint_rollback(savepoint, using=self.db)
+            inserted, pks = [], []
+            for obj in batch:
+                obj_pks = insert([obj])
+                if obj_pks:
+                    inserted.append(obj)
+                    pks.extend(obj_pks)
+        for obj, pk in zip(inserted, pks):
+            setattr(obj, meta.pk.attname, pk)
+        return inserted
+
+    def _insert_parent(self, parent, link, objs, batch_size, on_conflict, update_fields):
+        """Insert the rows of ``parent`` for ``objs``, updating ``update_fields`` on conflicts if upserting"""
+        parent_fields = parent._meta.local_concrete_fields
+        unique_fields = None
+        if on_conflict == constants.OnConflict.UPDATE:
+            update_fields = [f for f in update_fields if f in parent_fields]
+            if not update_fields:
+                # Keep the existing rows as they are
+                on_conflict = constants.OnConflict.IGNORE
+            elif connections[self.db].features.supports_update_conflicts_with_target:
+                unique_fields = [parent._meta.pk]
         else:
+            update_fields = None
+        if getattr(link, 'sparse', False) and not update_fields:
+            objs = [obj for obj in objs if not _holds_defaults(obj, parent)]
+            if not objs:
+                return
+        self._sync_parent_pks_to_pk(objs, parent)
+        parent._base_manager.using(self.db)._batched_insert(
+            objs, parent_fields, batch_size, on_conflict, update_fields, unique_fields,
+        )
+
+    def update(self, **kwargs):
+        """
+        Update the fields of all the objects in the queryset, with direct SQL ``UPDATE`` statements.
+
+        Django updates parent fields (when inheriting with MTI) by first fetching the
+        primary keys of all the selected objects, and then updating the parent tables
+        with the list of keys. Since broken-down parents share their primary key with the
+        object, we can instead update each parent table with a subquery, keeping the whole
+        operation in the database.
+
+        Also unlike Django, values may be expressions referring to fields of other parts
+        (e.g. ``update(para_count=F('child_count') + 1)``). Such values are computed in a
+        subquery which joins the parts as needed, and the table is updated from it with
+        an ``UPDATE ... FROM`` statement; this is supported on PostgreSQL and on SQLite >= 3.33.
+
+        The tables are updated one at a time, ordered so that each is updated before
+        those it depends on -- for computing values, or for selecting the objects.
+        Where this is not possible -- e.g. when the selection depends on fields of more
+        than one of the tables updated -- or the backend does not support what is needed,
+        Django's implementation is used.
+        """
+        self._not_support_combined_queries("update")
+        if self.query.is_sliced:
+            raise TypeError("Cannot update a query once a slice has been taken.")
+        model = self._concrete_model
+        updates = {}
+        for name, value in kwargs.items():
+            try:
+                owner = model._meta.get_field(name).model._meta.concrete_model
+            except FieldDoesNotExist:
+                owner = model  # Let Django produce the error
+            updates.setdefault(owner, {})[name] = value
+        plan = self._plan_update(updates)
+        if plan is None:
+            return super().update(**kwargs)
+
+        selected = self.order_by().values('pk')
+        rows = None
+        self._for_write = True
+        missing_parts, order = plan
+        with transaction.atomic(using=self.db, savepoint=False):
+            # Missing rows are created first, so that all the values computed see them
+            for parent in missing_parts:
+                self._create_missing_parts(parent, selected)
+            for target, from_subquery in order:
+                if from_subquery:
+                    count = self._update_from(target, updates[target])
+                elif target is model:
+                    count = super(BrokenDownQuerySet, self.order_by()).update(**updates[target])
+                else:
+                    queryset = target._base_manager.db_manager(self.db).filter(pk__in=selected)
+                    count = queryset.update(**updates[target])
+                if rows is None or target is model:
+                    rows = count
+        self._result_cache = None
+        return rows
+
+    update.alters_data = True
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        """
+        Update the given fields of the given objects, with one ``UPDATE`` for each table
+        and batch of objects.
+
+        Django's implementation updates all the fields with one :py:meth:`update` for each
+        batch; for a model with multi-table inheritance, each of these fetches the primary
+        keys of the objects before updating the parents' tables. Here, the fields are
+        split by the part they belong to, and the table of each part is updated by the
+        objects' primary keys, in batches sized by its own number of fields; tables with
+        none of the fields are not touched. Missing rows of sparse parts are created first.
+
+        Values may not be expressions referring to fields of other parts.
+        """
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError("Batch size must be a positive integer.")
+        if not fields:
+            raise ValueError("Field names must be given to bulk_update().")
+        objs = tuple(objs)
+        if any(obj.pk is None for obj in objs):
+            raise ValueError("All bulk_update() objects must have a primary key set.")
+        model = self._concrete_model
+        fields = [model._meta.get_field(name) for name in fields]
+        if any(not field.concrete or field.many_to_many for field in fields):
+            raise ValueError("bulk_update() can only be used with concrete fields.")
+        if any(field.primary_key for field in fields):
+            raise ValueError("bulk_update() cannot be used with primary key fields.")
+        if not objs:
+            return 0
+        for obj in objs:
+            obj._prepare_related_fields_for_save(operation_name="bulk_update", fields=fields)
+        owner_fields = {}
+        for field in fields:
+            owner_fields.setdefault(field.model._meta.concrete_model, []).append(field)
+        connection = connections[self.db]
+        self._for_write = True
+        rows = {}
+        with transaction.atomic(using=self.db, savepoint=False):
+            for owner, fields in owner_fields.items():
+                max_batch_size = connection.ops.bulk_batch_size(["pk", "pk"] + fields, objs)
+                owner_batch_size = min(batch_size, max_batch_size) if batch_size else max_batch_size
+                sparse = getattr(model._meta.parents.get(owner), 'sparse', False)
+                rows[owner] = 0
+                for start in range(0, len(objs), owner_batch_size):
+                    batch = objs[start:start + owner_batch_size]
+                    selected = self.filter(pk__in=[obj.pk for obj in batch]).order_by()
+                    values = self._bulk_update_values(batch, fields, connection)
+                    if owner is model:
+                        rows[owner] += super(BrokenDownQuerySet, selected).update(**values)
+                        continue
+                    if sparse:
+                        self._create_missing_parts(owner, selected.values('pk'))
+                    if self.query.has_filters():
+                        selected = selected.values('pk')
+                    else:
+                        selected = [obj.pk for obj in batch]
+                    rows[owner] += owner._base_manager.db_manager(self.db).filter(pk__in=selected).update(**values)
+        return rows.get(model, next(iter(rows.values())))
+
+    bulk_update.alters_data = True
+
+    @staticmethod
+    def _bulk_update_values(objs, fields, connection):
+        """The ``update()`` arguments for setting ``fields`` of each of ``objs`` to its own value"""
+        values = {}
+        for field in fields:
+            whens = []
+            for obj in objs:
+                value = getattr(obj, field.attname)
+                if not hasattr(value, 'resolve_expression'):
+                    value = Value(value, output_field=field)
+                whens.append(When(pk=obj.pk, then=value))
+            case = Case(*whens, output_field=field)
+            if connection.features.requires_casted_case_in_updates:
+                case = Cast(case, output_field=field)
+            values[field.attname] = case
+        return values
+
+    def _plan_update(self, updates):
+        """
+        Decide how to perform an update, given the values to set in each table (by model).
+
+        Return the sparse parents whose missing rows should be created first, and a list of
+        ``(model, from_subquery)`` pairs, in the order in which the tables should be updated,
+        where ``from_subquery`` tells if the values refer to other tables, and so require
+        ``UPDATE ... FROM``; or ``None``, if Django's implementation should be used.
+        """
+        model = self._concrete_model
+        filtered = _filtered_models(self.query.where)
+        if filtered is None:
+            return None
+        # The tables read for computing each table's values
+        value_reads = {target: set() for target in updates}
+        expressions = {
+            (target, name): value
+            for target, values in updates.items()
+            for name, value in values.items() if hasattr(value, 'resolve_expression')
+        }
+        if expressions:
+            aliases = {key: f'bdmodels_value_{i}' for i, key in enumerate(expressions)}
+            query = self.annotate(**{aliases[key]: value for key, value in expressions.items()}).query
+            for (target, name), alias in aliases.items():
+                referenced = _filtered_models(query.annotations[alias])
+                if referenced is None:
+                    return None
+                value_reads[target] |= referenced
+        from_subquery = {target: bool(value_reads[target] - {target}) for target in updates}
+        # ...and for the selection, too
+        reads = {target: value_reads[target] | filtered for target in updates}
+        if not updates.keys() & model._meta.parents.keys() and not any(from_subquery.values()):
             return None
 
+        connection = connections[self.db]
+        if any(from_subquery.values()) and not _can_update_from(connection):
+            return None
+        if not connection.features.update_can_self_select and any(
+            target in reads[target] for target in updates if target is not model or from_subquery[target]
+        ):
+            return None
+        # A table must be updated before the tables it reads
+        graph = graphlib.TopologicalSorter({
+            target: [other for other in updates if other is not target and target in reads[other]]
+            for target in updates
+        })
+        try:
+            order = list(graph.static_order())
+        except graphlib.CycleError:
+            return None
+        missing_parts = [
+            target for target in order
+            if target is not model and getattr(model._meta.parents[target], 'sparse', False)
+            and target not in filtered
+        ]
+        return missing_parts, [(target, from_subquery[target]) for target in order]
+
+    def _update_from(self, target, values):
+        """
+        Update the table of ``target`` (the model or one of its parents) with ``values``
+        computed in a subquery, with ``UPDATE ... FROM``
+        """
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        target_meta = target._meta
+        columns = {}
+        for i, (name, value) in enumerate(values.items()):
+            field = target_meta.get_field(name)
+            if not hasattr(value, 'resolve_expression'):
+                if field.remote_field and hasattr(value, 'prepare_database_save'):
+                    value = value.prepare_database_save(field)
+                value = models.Value(value, output_field=field)
+            columns[f'bdmodels_value_{i}'] = (field.column, value)
+        source = self.order_by().values(
+            bdmodels_pk=models.F('pk'), **{alias: value for alias, (_, value) in columns.items()}
+        )
+        sql, params = source.query.get_compiler(self.db).as_sql()
+        table = qn(target_meta.db_table)
+        assignments = ", ".join(f"{qn(column)} = source.{qn(alias)}" for alias, (column, _) in columns.items())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET {assignments} FROM ({sql}) source "
+                f"WHERE {table}.{qn(target_meta.pk.column)} = source.{qn('bdmodels_pk')}",
+                params,
+            )
+            return cursor.rowcount
+
+    def _create_missing_parts(self, parent, selected):
+        """Create, with defaults, the missing rows of a sparse ``parent`` for the ``selected`` objects"""
+        missing = selected.filter(~models.Exists(parent._base_manager.filter(pk=models.OuterRef('pk'))))
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        fields = [field for field in parent._meta.local_concrete_fields if not field.primary_key]
+        sql, params = missing.query.get_compiler(self.db).as_sql()
+        columns = ", ".join(qn(field.column) for field in [parent._meta.pk, *fields])
+        defaults = "".join(", %s" for _ in fields)
+        params = (*(field.get_db_prep_save(field.get_default(), connection) for field in fields), *params)
+        with connection.cursor() as cursor:
+            # The subquery selects just the PK
+            cursor.execute(
+                f"INSERT INTO {qn(parent._meta.db_table)} ({columns}) "
+                f"SELECT missing.*{defaults} FROM ({sql}) missing",
+                params,
+            )
+
+    def _check_bulk_create_options(
+        self, ignore_conflicts, update_conflicts, update_fields, unique_fields
+    ):
+        on_conflict = super()._check_bulk_create_options(
+            ignore_conflicts, update_conflicts, update_fields, unique_fields,
+        )
+        if on_conflict == constants.OnConflict.UPDATE and unique_fields:
+            meta = self._concrete_model._meta
+            if any(field not in meta.local_concrete_fields for field in unique_fields):
+                raise NotImplementedError(
+                    f"updating on conflict in bulk_create() for broken-down models requires "
+                    f"unique_fields of the table of {meta.label}."
+                )
+        return on_conflict
+
     def delete(self):
+        """
+        Delete the objects in the queryset.
+
+        When no signals need to be sent for the objects or their parents, and no other
+        objects are affected by their deletion, the rows are deleted from each of the
+        tables with a ``DELETE`` statement selecting the objects in a subquery, without
+        loading them. This requires that the selection does not depend on fields of the
+        parents (which are deleted first). Otherwise, Django's implementation is used.
+        """
+        model = self._concrete_model
+        filtered = _filtered_models(self.query.where)
+        if (
+            filtered is not None and not filtered & model._meta.parents.keys()
+            and self._fields is None and not self.query.is_sliced
+            and not self.query.distinct and not self.query.combinator
+            and _can_fast_delete(self.model, model._meta.parents)
+        ):
+            return self._fast_delete()
         # Prevent extra queries when looking up parents for deletion
         this = self.fetch_all_parents()
         return super(BrokenDownQuerySet, this).delete()
 
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def _fast_delete(self):
+        this = self.order_by()
+        selected = this.values('pk')
+        deleted = {}
+        with transaction.atomic(using=self.db, savepoint=False):
+            # The parents first, as the objects are selected from our own table
+            for parent in self._concrete_model._meta.parents:
+                parent_rows = parent._base_manager.db_manager(self.db).filter(pk__in=selected)
+                deleted[parent._meta.label] = parent_rows._raw_delete(self.db)
+            deleted[self.model._meta.label] = this._raw_delete(self.db)
+        self._result_cache = None
+        return sum(deleted.values()), deleted
+
     @staticmethod
     def _set_fields_from_returned_columns(objs, returned_columns, opts, *, set_pk):
         """This implementation works with Django>=3.0"""
@@ -298,6 +1062,122 @@ class BrokenDownModel(models.Model, metaclass=BrokenDownModelBase):
 
     objects = BrokenDownManager()
 
+    #: Set to ``True`` on a model to make its objects track changes to their fields: The values
+    #: of fields are recorded when they are loaded or saved, and :py:meth:`save` without
+    #: ``update_fields`` only writes the fields which changed since (see :py:meth:`get_changed_fields`),
+    #: skipping the tables of parents where nothing changed. If nothing changed at all, nothing
+    #: is saved, and no signals are sent.
+    track_changes = False
+
+    #: A :py:class:`PKAllocator <bdmodels.allocators.PKAllocator>` to take the primary keys of
+    #: new objects from, when they are saved or bulk-created without them; so that they are set
+    #: before any row is inserted (see :py:mod:`bdmodels.allocators`). By default, the primary
+    #: keys are generated by the database as the object's own row is inserted.
+    pk_allocator = None
+
+    #: Set to ``True`` on a model to make new objects, on PostgreSQL, be inserted together with
+    #: the rows of all their parts in a single statement (using data-modifying ``WITH`` clauses),
+    #: rather than one statement for each table. On other databases, and for models whose parents
+    #: have parents of their own or fields returned from inserts, this has no effect.
+    single_statement_insert = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        new = super().from_db(db, field_names, values)
+        if new.pk is not None:
+            for parent, link in new._concrete_meta.parents.items():
+                if getattr(link, 'sparse', False) and new.__dict__.get(parent._meta.pk.attname, False) is None:
+                    # Outer-joined, and the row is missing
+                    new._set_missing_part(parent)
+        if cls.track_changes:
+            new._record_loaded_values(new._meta.concrete_fields)
+        return new
+
+    def _record_loaded_values(self, fields):
+        """Take a snapshot of the values of the given fields, where they are set on the object"""
+        loaded_values = getattr(self._state, 'loaded_values', None)
+        if loaded_values is None:
+            loaded_values = self._state.loaded_values = {}
+        for field in fields:
+            if field.attname in self.__dict__:
+                loaded_values[field.attname] = _snapshot(self.__dict__[field.attname])
+
+    def _set_missing_part(self, parent, fields=None):
+        """
+        Set the fields of a sparse parent, whose row is missing, to their defaults.
+        The parent's PK is set to ``None``, marking the row as missing.
+        """
+        if fields is None:
+            fields = parent._meta.local_concrete_fields
+        for field in fields:
+            setattr(self, field.attname, None if field.primary_key else field.get_default())
+        if self.track_changes:
+            self._record_loaded_values(fields)
+
+    def _part_missing(self, parent):
+        """Is the row of the (sparse) ``parent`` missing, or not created yet?"""
+        pk_attname = parent._meta.pk.attname
+        if pk_attname not in self.__dict__:
+            # The part was not loaded (a deferred parent PK just reads our own);
+            # load it, to find out
+            self.refresh_from_db(fields=[
+                field.attname for field in parent._meta.local_concrete_fields
+                if field.attname not in self.__dict__
+            ])
+        return self.__dict__[pk_attname] is None
+
+    def get_changed_fields(self) -> set:
+        """
+        Return the names of the fields whose values changed since they were loaded or saved.
+
+        Only fields set on the object are considered. If the model does not track changes
+        (see :py:attr:`track_changes`), all of them are considered changed.
+        """
+        loaded_values = getattr(self._state, 'loaded_values', None) or {}
+        return {
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in self.__dict__
+            and (
+                field.attname not in loaded_values
+                or loaded_values[field.attname] != self.__dict__[field.attname]
+            )
+        }
+
+    def save(self, *args, **kwargs):
+        if (
+            self.track_changes
+            and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+            and not self._state.adding
+            and self.pk is not None
+            and kwargs.get('using') in (None, self._state.db)
+            and getattr(self._state, 'loaded_values', None) is not None
+        ):
+            update_fields = self.get_changed_fields()
+            if update_fields:
+                # Fields like auto_now are changed by saving
+                update_fields.update(
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname in self.__dict__ and _changed_by_update(field, self)
+                )
+            kwargs['update_fields'] = update_fields
+        return super().save(*args, **kwargs)
+
+    save.alters_data = True
+
+    def _set_pk_val(self, value):
+        # Set the PKs of the parents too, as Django does -- but with the parent links
+        # of the concrete model, as the Options of a proxy model have none
+        meta = self._concrete_meta
+        for parent_link in meta.parents.values():
+            if parent_link and parent_link != meta.pk:
+                setattr(self, parent_link.target_field.attname, value)
+        return setattr(self, meta.pk.attname, value)
+
+    pk = property(models.Model._get_pk_val, _set_pk_val)
+
     def getattr_if_loaded(self, attr: str, default=None):
         """
         Access an attribute (field), only if set specifically for the instance.
@@ -310,6 +1190,19 @@ class BrokenDownModel(models.Model, metaclass=BrokenDownModelBase):
     def delete(self, using=None, keep_parents=False):
         opts = self._concrete_meta
         parents = opts.parents.keys()
+        if self.pk is not None and _can_fast_delete(self.__class__, () if keep_parents else parents):
+            # Nothing to collect; just delete the rows
+            using = using or router.db_for_write(self.__class__, instance=self)
+            deleted_models = [self._meta.concrete_model, *(() if keep_parents else parents)]
+            deleted = {}
+            with transaction.atomic(using=using, savepoint=False):
+                for model in deleted_models:
+                    rows = model._base_manager.db_manager(using).filter(pk=self.pk)
+                    label = self._meta.label if model is self._meta.concrete_model else model._meta.label
+                    deleted[label] = rows._raw_delete(using)
+            for model in deleted_models:
+                setattr(self, model._meta.pk.attname, None)
+            return sum(deleted.values()), deleted
         all_fields = get_field_names_to_fetch(parents)
         self.refresh_from_db(using=using, fields=all_fields)  # TODO: Use .refresh_from_db(all_parents=True)
         return super().delete(using=using, keep_parents=keep_parents)
@@ -334,16 +1227,65 @@ class BrokenDownModel(models.Model, metaclass=BrokenDownModelBase):
             if all_parents:
                 raise ValueError("refresh_from_db() with all_parents=True and specific fields makes no sense")
             parents = set(opts.get_field(name).model for name in fields)
+            if from_queryset is None and self._fields_deferred(fields):
+                # Loading deferred parents, rather than refreshing
+                group = getattr(self._state, 'fetch_group', None)
+                loaded_parents = frozenset(parents.intersection(opts.parents))
+                if loaded_parents:
+                    signals.parts_loaded.send(
+                        sender=self.__class__, instance=self, parents=loaded_parents, fetch_group=group,
+                    )
+                if group is not None:
+                    # One of a set of objects fetched together; let the group know,
+                    # it may fetch the parents for all of them
+                    group.parents_loaded(loaded_parents, using or self._state.db)
+                    fields = [name for name in fields if opts.get_field(name).attname not in self.__dict__]
+                    if not fields:
+                        return
+                    parents = set(opts.get_field(name).model for name in fields)
             all_fields = get_field_names_to_fetch(parents)
             # Take special care *not* to override fields which have been set on the object,
             # unless they were specifically requested for refresh
             fields = list(set(all_fields) - set(self.__dict__.keys()) | set(fields))
+            if from_queryset is None and len(parents) == 1 and parents <= opts.parents.keys():
+                # Fields of a single parent; no need to involve our own table
+                self._refresh_parent(parents.pop(), using, fields)
+                return
         elif all_parents:
             fields = [field.name for field in opts.concrete_fields]
         if django.VERSION <= (5, 1):
             super().refresh_from_db(using, fields)
         else:
             super().refresh_from_db(using, fields, from_queryset)
+        if self.track_changes:
+            self._record_loaded_values(
+                opts.concrete_fields if fields is None else [opts.get_field(name) for name in fields]
+            )
+
+    def _refresh_parent(self, parent, using, field_names):
+        """
+        Load the given fields of a parent, querying only the parent's table --
+        since the parent's PK is known, the join with our own table is redundant.
+        """
+        link = self._concrete_meta.parents[parent]
+        hints = {"instance": self}
+        queryset = parent._base_manager.db_manager(using, hints=hints).only(*field_names)
+        fields = [
+            f for f in parent._meta.local_concrete_fields
+            if f.name in field_names or f.attname in field_names
+        ]
+        try:
+            db_instance = queryset.get(**{link.target_field.attname: getattr(self, link.attname)})
+        except parent.DoesNotExist:
+            if getattr(link, 'sparse', False):
+                self._set_missing_part(parent, fields)
+                return
+            raise self.DoesNotExist(f"{self._meta.object_name} matching query does not exist.") from None
+        _copy_loaded_fields(self, db_instance, fields)
+
+    def _fields_deferred(self, names):
+        opts = self._concrete_meta
+        return not any(opts.get_field(name).attname in self.__dict__ for name in names)
 
     @property
     def _concrete_meta(self):
@@ -473,12 +1415,25 @@ class BrokenDownModel(models.Model, metaclass=BrokenDownModelBase):
         return errors
 
     def save_base(self, *, force_insert=False, **kwargs):
+        if self.pk is None and self.pk_allocator is not None and not kwargs.get('raw'):
+            using = kwargs.get('using') or router.db_for_write(self.__class__, instance=self)
+            self.pk, = self.pk_allocator.allocate(self._meta.concrete_model, 1, using)
+            force_insert = True
+        work = unitofwork.current()
+        if work is not None and work.record(self, force_insert=force_insert, **kwargs):
+            return
         if force_insert or self.pk is None:
             # We need to reverse the order that saving is usually done for the case of inserting.
             # First save ourselves (and get an id), only then save parents
             self._reversed_save_base(force_insert=force_insert, **kwargs)
         else:
             super().save_base(force_insert=force_insert, **kwargs)
+        if self.track_changes:
+            update_fields = kwargs.get('update_fields')
+            self._record_loaded_values(
+                self._meta.concrete_fields if update_fields is None
+                else [self._meta.get_field(name) for name in update_fields]
+            )
 
     save_base.alters_data = True
 
@@ -512,13 +1467,17 @@ class BrokenDownModel(models.Model, metaclass=BrokenDownModelBase):
         else:
             context_manager = transaction.mark_for_rollback_on_error(using=using)
         with context_manager:
-            # In this block we change the order of calls
-            updated = self._save_table(
-                raw, cls, force_insert,
-                force_update, using, update_fields,
-            )
-            if not raw:
-                self._save_parents(cls, using, update_fields)
+            if not (raw or update_fields or force_update) and self._can_insert_at_once(cls, using):
+                self._insert_at_once(cls, using)
+                updated = False
+            else:
+                # In this block we change the order of calls
+                updated = self._save_table(
+                    raw, cls, force_insert,
+                    force_update, using, update_fields,
+                )
+                if not raw:
+                    self._save_parents(cls, using, update_fields)
         # Store the database on which the object was saved
         self._state.db = using
         # Once saved, this is no longer a to-be-added instance.
@@ -531,6 +1490,71 @@ class BrokenDownModel(models.Model, metaclass=BrokenDownModelBase):
                 update_fields=update_fields, raw=raw, using=using,
             )
 
+    def _can_insert_at_once(self, cls, using):
+        if not (self.single_statement_insert and connections[using].vendor == 'postgresql'):
+            return False
+        meta = cls._meta
+        return (
+            all(field == meta.pk for field in meta.db_returning_fields) and
+            all(
+                field and not parent._meta.parents and
+                all(parent_field.primary_key for parent_field in parent._meta.db_returning_fields)
+                for parent, field in meta.parents.items()
+            )
+        )
+
+    def _insert_at_once(self, cls, using):
+        """
+        Insert the object's own row, and the rows of its parents, with a single statement:
+        The own row is inserted in a ``WITH`` clause, so the parents can take its PK from there.
+        """
+        connection = connections[using]
+        qn = connection.ops.quote_name
+        meta = cls._meta
+        pk_set = self.pk is not None
+        parents = [
+            parent for parent, field in meta.parents.items()
+            if not (getattr(field, 'sparse', False) and _holds_defaults(self, parent))
+        ]
+
+        def insert_sql(model, returning_fields=None):
+            fields = [
+                field for field in model._meta.local_concrete_fields
+                if not getattr(field, 'generated', False) and (pk_set or field is not meta.auto_field)
+            ]
+            query = InsertQuery(model)
+            query.insert_values(fields, [self])
+            compiler = query.get_compiler(using=using)
+            compiler.returning_fields = returning_fields
+            (sql, params), = compiler.as_sql()
+            return sql, params
+
+        core_sql, params = insert_sql(cls, [meta.pk])
+        clauses = [f"bdmodels_core AS ({core_sql})"]
+        params = list(params)
+        for i, parent in enumerate(parents):
+            pk_attname = parent._meta.pk.attname
+            parent_pk = self.__dict__.get(pk_attname)
+            # Take the PK from the own row, unless we know it already
+            self.__dict__[pk_attname] = (
+                self.pk if pk_set else RawSQL(f"SELECT {qn(meta.pk.column)} FROM bdmodels_core", ())
+            )
+            try:
+                parent_sql, parent_params = insert_sql(parent)
+            finally:
+                self.__dict__[pk_attname] = parent_pk
+            clauses.append(f"bdmodels_part_{i} AS ({parent_sql})")
+            params.extend(parent_params)
+        with connection.cursor() as cursor:
+            cursor.execute(f"WITH {', '.join(clauses)} SELECT * FROM bdmodels_core", params)
+            pk, = cursor.fetchone()
+        setattr(self, meta.pk.attname, pk)
+        for parent in parents:
+            setattr(self, parent._meta.pk.attname, pk)
+            field = meta.parents[parent]
+            if field.is_cached(self):
+                field.delete_cached_value(self)
+
     def _save_parents(self, cls, using, update_fields, force_insert=(), updated_parents=None):
         """Save all the parents of cls using values from self."""
         # Overridden for efficiency. We know it is likely that some
@@ -541,6 +1565,16 @@ class BrokenDownModel(models.Model, metaclass=BrokenDownModelBase):
         for parent, field in meta.parents.items():
             if parent not in parents_to_save:
                 continue
+            if getattr(field, 'sparse', False) and self._part_missing(parent):
+                if _holds_defaults(self, parent):
+                    # Nothing worth a row yet
+                    continue
+                # Create the row, with all of the part's fields; it is known to be missing
+                setattr(self, parent._meta.pk.attname, getattr(self, field.attname))
+                self._save_table(cls=parent, using=using, force_insert=True)
+                if self.track_changes:
+                    self._record_loaded_values(parent._meta.local_concrete_fields)
+                continue
             # Make sure the link fields are synced between parent and self.
             if (field and getattr(self, parent._meta.pk.attname) is None and
                     getattr(self, field.attname) is not None):
@@ -0,0 +1,76 @@
+"""
+SQL helpers for working on the rows of parts in bulk, shared by the migration operations
+and the management commands
+
+Conditions selecting rows are SQL strings with a ``{pk}`` placeholder, to be formatted with
+the (qualified) primary key column of the table they apply to; their parameters are passed
+separately, after any parameters of the statement they are used in.
+"""
+from django.db.models import NOT_PROVIDED
+
+
+def pk_chunks(connection, model, chunk_size, last=None):
+    """
+    Generate ``(condition, params, end)`` for the chunks of ``chunk_size`` primary keys of ``model``'s
+    table after ``last``; ``condition`` is on the ``{pk}`` column, and ``end`` is the last primary key
+    of the chunk, or ``None`` for the last chunk, which is not bounded above.
+    """
+    qn = connection.ops.quote_name
+    table, column = qn(model._meta.db_table), qn(model._meta.pk.column)
+    while True:
+        conditions, params = ([], []) if last is None else (["{pk} > %s"], [last])
+        with connection.cursor() as cursor:
+            # The last primary key of the next chunk
+            cursor.execute(
+                f"SELECT {column} FROM {table} WHERE {' AND '.join(conditions) or '1 = 1'} "
+                f"ORDER BY {column} LIMIT 1 OFFSET {chunk_size - 1}".format(pk=column),
+                params,
+            )
+            row = cursor.fetchone()
+        if row is not None:
+            conditions.append("{pk} <= %s")
+            params.append(row[0])
+        yield " AND ".join(conditions) or "1 = 1", params, None if row is None else row[0]
+        if row is None:
+            return
+        last = row[0]
+
+
+def missing_part_rows(connection, model, part, condition="1 = 1"):
+    """
+    The ``FROM`` and ``WHERE`` clauses selecting the rows of ``model``'s table which are selected
+    by ``condition`` and have no row in the table of ``part``
+    """
+    qn = connection.ops.quote_name
+    table, pk = qn(model._meta.db_table), qn(model._meta.pk.column)
+    part_table, part_pk = qn(part._meta.db_table), qn(part._meta.pk.column)
+    return (
+        f"FROM {table} WHERE {condition.format(pk=f'{table}.{pk}')} "
+        f"AND NOT EXISTS (SELECT 1 FROM {part_table} WHERE {part_table}.{part_pk} = {table}.{pk})"
+    )
+
+
+def populate_part_sql(connection, model, part, condition="1 = 1", defaults=None):
+    """
+    The SQL and parameters of an ``INSERT`` creating the rows of ``part`` which are missing for the
+    rows of ``model``'s table selected by ``condition``, with the defaults of the part's fields
+    (fields with database defaults are left to the database)
+
+    The parameters are ``defaults`` if given -- the parameters returned by an earlier call, so that
+    callable defaults are evaluated once for several chunks of rows.
+    """
+    qn = connection.ops.quote_name
+    fields = [
+        field for field in part._meta.local_concrete_fields
+        if not field.primary_key and getattr(field, 'db_default', NOT_PROVIDED) is NOT_PROVIDED
+    ]
+    columns = "".join(f", {qn(field.column)}" for field in fields)
+    placeholders = "".join(", %s" for _ in fields)
+    if defaults is None:
+        defaults = [field.get_db_prep_save(field.get_default(), connection) for field in fields]
+    sql = (
+        f"INSERT INTO {qn(part._meta.db_table)} ({qn(part._meta.pk.column)}{columns}) "
+        f"SELECT {qn(model._meta.db_table)}.{qn(model._meta.pk.column)}{placeholders} "
+        f"{missing_part_rows(connection, model, part, condition)}"
+    )
+    return sql, defaults
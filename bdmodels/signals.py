@@ -0,0 +1,10 @@
+from django.dispatch import Signal
+
+# Sent when fields of an object's parents, which were deferred, are loaded from the database.
+# Arguments:
+#   sender: The model class of the object
+#   instance: The object
+#   parents: A frozenset of the parent models being loaded
+#   fetch_group: An opaque object, shared by all the objects fetched together by one
+#                evaluation of a queryset; or None, if this is not tracked for the object
+parts_loaded = Signal()
@@ -35,6 +35,14 @@ class InvalidFieldTestCase(TestCase):
         with self.assertWarnsMessage(Warning, "Constraints on virtual fields are not implemented yet"):
             VirtualOneToOneField(self.Target, 'id', on_delete=models.DO_NOTHING, db_constraint=True)
 
+    def test_sparse_arg(self):
+        with self.assertRaisesMessage(ValueError, "Only a parent link can be sparse"):
+            VirtualOneToOneField(self.Target, 'id', on_delete=models.DO_NOTHING, sparse=True)
+        field = VirtualOneToOneField(self.Target, 'id', on_delete=models.DO_NOTHING, parent_link=True, sparse=True)
+        name, path, args, kwargs = field.deconstruct()
+        self.assertIs(kwargs['sparse'], True)
+        self.assertNotIn('null', kwargs)
+
 
 @isolate_apps('bdmodels')
 class InvalidModelsTestCase(TestCase):
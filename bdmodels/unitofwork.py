@@ -0,0 +1,161 @@
+"""
+Coalescing saves of broken-down objects into batches
+
+Within :py:func:`unit_of_work`, saving a broken-down object does not write it right away;
+the save is recorded, and when the unit of work is flushed -- at the end of the block, or
+by calling :py:meth:`UnitOfWork.flush` -- all the recorded saves are written together:
+objects with the same model and the same fields to update are written with one
+``bulk_update()``, and new objects of a model with one ``bulk_create()``.
+
+Only saves whose outcome is known in advance are recorded:
+
+- Updates of objects which were loaded from the database, or saved before;
+- Inserts of new objects of models with a :py:attr:`pk_allocator
+  <bdmodels.models.BrokenDownModel.pk_allocator>`, which gives them their primary keys
+  when they are saved. Without one, new objects would not have primary keys until
+  they are written, and could not be referenced.
+
+Other saves flush the recorded ones, and are then performed as usual, so the order of
+writes is kept. Saves of other models, as well as queries, deletions etc., are not
+affected -- they do not see the recorded saves until these are flushed.
+
+The ``pre_save`` and ``post_save`` signals are sent for each recorded save, in the order
+of the saves, when they are flushed: ``pre_save`` for all of them before writing, and
+``post_save`` after. An object saved more than once is written once, and gets one pair
+of signals.
+
+If the block is exited with an exception, the recorded saves are discarded.
+"""
+import contextlib
+import contextvars
+
+from django.db import transaction
+from django.db.models import signals
+
+_current = contextvars.ContextVar('bdmodels_unit_of_work', default=None)
+
+
+def current():
+    """The active :py:class:`UnitOfWork`, or ``None``"""
+    return _current.get()
+
+
+class _Save:
+    __slots__ = ('instance', 'using', 'insert', 'update_fields')
+
+    def __init__(self, instance, using, insert, update_fields):
+        self.instance = instance
+        self.using = using
+        self.insert = insert
+        self.update_fields = update_fields
+
+
+class UnitOfWork:
+    """A record of saves of broken-down objects, to be written together"""
+
+    def __init__(self):
+        self._saves = {}
+
+    def __len__(self):
+        """The number of objects with saves recorded"""
+        return len(self._saves)
+
+    def record(self, instance, *, raw=False, force_insert=False, force_update=False, using=None, update_fields=None):
+        """
+        Record a save of ``instance``, if possible; return whether it was recorded.
+        Called by :py:meth:`save_base() <bdmodels.models.BrokenDownModel.save_base>`.
+        """
+        key = id(instance)
+        save = self._saves.get(key)
+        if save is not None and save.using == using and not raw:
+            # Saved again, before the first save was written
+            if not save.insert:
+                if save.update_fields is None or update_fields is None:
+                    save.update_fields = None
+                else:
+                    save.update_fields |= frozenset(update_fields)
+            return True
+        insert = instance._state.adding and force_insert is True and instance.pk is not None
+        update = not (instance._state.adding or force_insert) and instance.pk is not None
+        if raw or not (insert or update):
+            self.flush()
+            return False
+        if save is not None:
+            self.flush()
+        self._saves[key] = _Save(
+            instance, using, insert, None if update_fields is None else frozenset(update_fields),
+        )
+        return True
+
+    def flush(self):
+        """Write all the recorded saves"""
+        saves = list(self._saves.values())
+        self._saves.clear()
+        if not saves:
+            return
+        # Imported here, as the models module uses this one
+        from .models import BrokenDownQuerySet
+
+        for save in saves:
+            signals.pre_save.send(
+                sender=type(save.instance), instance=save.instance, raw=False, using=save.using,
+                update_fields=save.update_fields,
+            )
+        batches = {}
+        for save in saves:
+            model = save.instance._meta.concrete_model
+            fields = None if save.insert else self._fields_to_update(save)
+            if fields != frozenset():
+                batches.setdefault((model, save.using, fields), []).append(save.instance)
+        with contextlib.ExitStack() as stack:
+            for using in {save.using for save in saves}:
+                stack.enter_context(transaction.atomic(using=using))
+            for (model, using, fields), objs in batches.items():
+                queryset = BrokenDownQuerySet(model, using=using)
+                if fields is None:
+                    queryset.bulk_create(objs)
+                else:
+                    queryset.bulk_update(objs, sorted(fields))
+        for save in saves:
+            instance = save.instance
+            instance._state.db = save.using
+            if instance.track_changes:
+                meta = instance._meta
+                instance._record_loaded_values(
+                    meta.concrete_fields if save.update_fields is None
+                    else [meta.get_field(name) for name in save.update_fields]
+                )
+            signals.post_save.send(
+                sender=type(instance), instance=instance, created=save.insert,
+                update_fields=save.update_fields, raw=False, using=save.using,
+            )
+
+    @staticmethod
+    def _fields_to_update(save):
+        """The names of the fields to update, after applying their ``pre_save()`` (e.g. for ``auto_now``)"""
+        instance = save.instance
+        fields = [
+            field for field in instance._meta.concrete_fields
+            if not field.primary_key and field.attname in instance.__dict__
+            and (save.update_fields is None or field.name in save.update_fields)
+        ]
+        for field in fields:
+            field.pre_save(instance, False)
+        return frozenset(field.name for field in fields)
+
+
+@contextlib.contextmanager
+def unit_of_work():
+    """
+    Record the saves of broken-down objects in the block, and write them together at its end.
+
+    Returns the :py:class:`UnitOfWork`, which can also be flushed explicitly. Units of work can be
+    nested; saves are recorded by the innermost one.
+    """
+    work = UnitOfWork()
+    token = _current.set(work)
+    try:
+        yield work
+    finally:
+        _current.reset(token)
+    work.flush()
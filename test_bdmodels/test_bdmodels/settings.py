@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'bdmodels',
+    'bdmodels.hilo',
     'testapp',
     'testmigs',
     #  'django_model_inheritance',  # Doesn't work yet -- see TODO: comment in its models.py
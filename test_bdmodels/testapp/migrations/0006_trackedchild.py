@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0005_childwithvirtualnonparent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackedChild',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('testapp.child',),
+        ),
+    ]
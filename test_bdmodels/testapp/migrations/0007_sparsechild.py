@@ -0,0 +1,46 @@
+import bdmodels.fields
+import bdmodels.migration_ops
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0006_trackedchild'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParentD',
+            fields=[
+                ('did', models.AutoField(primary_key=True, serialize=False)),
+                ('pard_name', models.CharField(default='', max_length=10)),
+                ('pard_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SparseChild',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('child_name', models.CharField(max_length=10)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        bdmodels.migration_ops.AddVirtualField(
+            model_name='sparsechild',
+            name='parenta_ptr',
+            field=bdmodels.fields.VirtualParentLink(
+                from_field='id', on_delete=django.db.models.deletion.DO_NOTHING, to='testapp.parenta',
+            ),
+        ),
+        bdmodels.migration_ops.AddVirtualField(
+            model_name='sparsechild',
+            name='parentd_ptr',
+            field=bdmodels.fields.VirtualParentLink(
+                from_field='id', on_delete=django.db.models.deletion.DO_NOTHING, sparse=True, to='testapp.parentd',
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0007_sparsechild'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parentc',
+            name='parc_date',
+            field=models.DateField(null=True),
+        ),
+    ]
@@ -21,6 +21,7 @@ class ParentC(models.Model):
     cid = models.AutoField(primary_key=True)
     parc_name = models.CharField(max_length=10)
     parc_zit = models.BooleanField(default=True)
+    parc_date = models.DateField(null=True)
 
 
 class Child(BrokenDownModel, ParentA, ParentB, ParentC):
@@ -92,3 +93,23 @@ class ChildWithVirtualNonParent(BrokenDownModel, ParentA):
     parenta_ptr = VirtualParentLink(ParentA, on_delete=models.DO_NOTHING)
     b = VirtualOneToOneField(ParentB, 'id', on_delete=models.DO_NOTHING)
     child_name = models.CharField(max_length=10)
+
+
+class TrackedChild(Child):
+    track_changes = True
+
+    class Meta:
+        proxy = True
+
+
+class ParentD(models.Model):
+    did = models.AutoField(primary_key=True)
+    pard_name = models.CharField(max_length=10, default='')
+    pard_count = models.IntegerField(default=0)
+
+
+class SparseChild(BrokenDownModel, ParentA, ParentD):
+    id = models.AutoField(primary_key=True)
+    parenta_ptr = VirtualParentLink(ParentA, on_delete=models.DO_NOTHING)
+    parentd_ptr = VirtualParentLink(ParentD, sparse=True, on_delete=models.DO_NOTHING)
+    child_name = models.CharField(max_length=10)
@@ -18,14 +18,18 @@ pstats.Stats class from the standard library, for analysis, e.g:
     stats = Stats('test_save_new_object.prof')
 
 See https://docs.python.org/3/library/profile.html#the-stats-class
+
+Tests which compare the number of database round-trips print them.
 """
 import functools
 from os import environ
-from unittest import SkipTest
+from unittest import SkipTest, mock
 
 from cProfile import Profile
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from .models import Child
 
@@ -102,3 +106,26 @@ class ObjectUpdatePerformanceTestCase(TestCase):
             c.para_name = f'Xerxes {i:3}'
             c.save(update_fields=['para_name'])
         self.assertEqual(Child.objects.all().count(), 1)
+
+
+class ObjectInsertRoundTripsTestCase(TestCase):
+    N = 200
+
+    def save_new_objects(self):
+        child = Child(para_name='A', parb_name='B', parc_name='C', parc_zit=True)
+        with CaptureQueriesContext(connection) as queries:
+            for i in range(1, self.N+1):
+                child.pk = child.aid = child.bid = child.cid = None
+                child.child_name = f'Xerxes {i:3}'
+                child.save()
+        print(f"\n{self.id()}: {len(queries)} queries for {self.N} objects on {connection.vendor}")
+        self.assertEqual(Child.objects.all().count(), self.N)
+
+    @profile
+    def test_save_new_object_per_table(self):
+        self.save_new_objects()
+
+    @profile
+    def test_save_new_object_single_statement(self):
+        with mock.patch.object(Child, 'single_statement_insert', True):
+            self.save_new_objects()
@@ -1,8 +1,31 @@
+import datetime
+import inspect
+import pickle
+import warnings
+from io import StringIO
+from unittest import mock, skipIf, skipUnless
+
+import django
 from django.contrib.auth import get_user_model
-from django.db import DatabaseError, transaction
+from django.core.exceptions import FieldError
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, signals
+from django.db.models.functions import Concat
 from django.test import TestCase, skipIfDBFeature, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+
+from bdmodels.adaptive import ParentUsageProfile
+from bdmodels import unit_of_work
+from bdmodels.allocators import HiLoAllocator
+from bdmodels.detection import (
+    PartLoadAssertionsMixin, PartLoadDetector, RepeatedPartLoad, RepeatedPartLoadWarning,
+)
 
-from .models import Child, UserChild, Nephew, TimeStampedChild, ChildProxy, ChildWithVirtualNonParent, ParentB
+from .models import (
+    Child, UserChild, Nephew, TimeStampedChild, ChildProxy, ChildWithVirtualNonParent, ParentA, ParentB, ParentC,
+    TrackedChild, SparseChild, ParentD,
+)
 
 
 # TODO: Rename test classes
@@ -78,21 +101,21 @@ class SelectRelatedTestCase(TestCase):
             self.assertEqual(cc.user.username, 'artaxerxes')
 
     def test_delete_qset(self):
-        # 5 queries -- one to get the objects, and one to delete each part
-        with self.assertNumQueries(5):
+        # 4 queries -- one to delete each part, no need to get the objects
+        with self.assertNumQueries(4):
             self.ChildClass.objects.filter(child_name='Xerxes').delete()
 
     def test_delete_many(self):
         self.ChildClass.objects.create(para_name='A', parb_name='B', parc_name='C', child_name='Yeryes')
         self.ChildClass.objects.create(para_name='A', parb_name='B', parc_name='C', child_name='Zerzes')
-        # 5 queries -- one to get the objects, and one to delete each part
-        with self.assertNumQueries(5):
+        # 4 queries -- one to delete each part, no need to get the objects
+        with self.assertNumQueries(4):
             self.ChildClass.objects.filter(child_name='Xerxes').delete()
 
     def test_delete_object(self):
         obj = self.ChildClass.objects.get(child_name='Xerxes')
-        # 5 queries -- one to fill out the object, and one to delete each part
-        with self.assertNumQueries(5):
+        # 4 queries -- one to delete each part, no need to fill out the object
+        with self.assertNumQueries(4):
             obj.delete()
 
     def test_getattr_if_loaded_gets_loaded(self):
@@ -337,13 +360,971 @@ class BulkCreateTestCase(TestCase):
         kids = Child.objects.filter(child_name__in=['X0', 'X1', 'X2'])
         self.assertEqual(len(kids), 3)
 
-    def test_update_on_conflict_errors_out(self):
+    def test_ignore_on_conflict_parents_of_new_rows_only(self):
+        Child.objects.create(id=22, para_name='A0', parb_name='B0', parc_name='C0', child_name='X0')
+        ParentA.objects.filter(aid=22).delete()
+        children = [
+            Child(id=22, para_name='A1', parb_name='B1', parc_name='C1', child_name='X1'),
+            Child(id=23, para_name='A2', parb_name='B2', parc_name='C2', child_name='X2'),
+        ]
+        Child.objects.bulk_create(children, ignore_conflicts=True)
+        # The existing object's parts are left as they were
+        self.assertFalse(ParentA.objects.filter(aid=22).exists())
+        self.assertEqual(ParentB.objects.get(bid=22).parb_name, 'B0')
+        self.assertEqual(Child.objects.get(id=22).child_name, 'X0')
+        # The new one is complete
+        kid = Child.objects.get(id=23)
+        self.assertEqual((kid.para_name, kid.parb_name, kid.parc_name), ('A2', 'B2', 'C2'))
+
+    def test_ignore_on_conflict_without_pks(self):
+        Child.objects.create(id=22, para_name='A0', parb_name='B0', parc_name='C0', child_name='X0')
+        children = [
+            Child(para_name='A1', parb_name='B1', parc_name='C1', child_name='X1'),
+            Child(para_name='A2', parb_name='B2', parc_name='C2', child_name='X2'),
+        ]
+        Child.objects.bulk_create(children, ignore_conflicts=True)
+        for kid in children:
+            self.assertEqual(Child.objects.get(pk=kid.pk).para_name, kid.para_name)
+
+    def test_bulk_create_iter(self):
+        children = (
+            Child(id=30 + i, para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+            for i in range(5)
+        )
+        progress = []
+        with self.assertNumQueries(3 * 4):
+            count = Child.objects.bulk_create_iter(children, batch_size=2, progress=progress.append)
+        self.assertEqual(count, 5)
+        self.assertEqual(progress, [2, 4, 5])
+        kids = Child.objects.filter(id__gte=30).fetch_all_parents().order_by('id')
+        self.assertEqual([(k.id, k.para_name, k.parc_name) for k in kids], [(30 + i, f'A{i}', f'C{i}') for i in range(5)])
+
+    def test_update_on_conflict_unsupported_unique_fields(self):
         children = [
             Child(id=22, para_name='A0', parb_name='B0', parc_name='C0', parc_zit=True, child_name='X0'),
-            Child(id=23, para_name='A1', parb_name='B1', parc_name='C1', parc_zit=True, child_name='X1'),
-            Child(id=24, para_name='A2', parb_name='B2', parc_name='C2', parc_zit=True, child_name='X2'),
         ]
         with self.assertRaises(NotImplementedError):
-            Child.objects.bulk_create(children, update_conflicts=True)
-        with self.assertRaises(NotImplementedError):
-            Child.objects.bulk_create(children, update_fields=['child_name'])
+            Child.objects.bulk_create(
+                children, update_conflicts=True, update_fields=['child_name'], unique_fields=['para_name'],
+            )
+
+    @skipUnlessDBFeature('supports_update_conflicts')
+    def test_update_on_conflict(self):
+        Child.objects.create(id=22, para_name='A0', parb_name='B0', parc_name='C0', child_name='X0')
+        children = [
+            Child(id=22, para_name='A1', parb_name='B1', parc_name='C1', child_name='X1'),
+            Child(id=23, para_name='A2', parb_name='B2', parc_name='C2', child_name='X2'),
+        ]
+        with self.assertNumQueries(4):
+            Child.objects.bulk_create(
+                children, update_conflicts=True, update_fields=['para_name', 'parc_name'], unique_fields=['pk'],
+            )
+        kids = Child.objects.fetch_all_parents().order_by('id')
+        self.assertEqual(
+            [(kid.child_name, kid.para_name, kid.parb_name, kid.parc_name) for kid in kids],
+            [('X0', 'A1', 'B0', 'C1'), ('X2', 'A2', 'B2', 'C2')],
+        )
+
+    @skipIf(django.VERSION < (5, 0), "Django<5.0 does not return ids from bulk_create() with update_conflicts")
+    @skipUnlessDBFeature('supports_update_conflicts', 'can_return_rows_from_bulk_insert')
+    def test_update_on_conflict_new_objects(self):
+        Child.objects.create(id=22, para_name='A0', parb_name='B0', parc_name='C0', child_name='X0')
+        children = [
+            Child(id=22, child_name='X1', para_name='A1', parb_name='B1', parc_name='C1'),
+            Child(child_name='X2', para_name='A2', parb_name='B2', parc_name='C2'),
+        ]
+        Child.objects.bulk_create(
+            children, update_conflicts=True, update_fields=['child_name', 'parb_name'], unique_fields=['id'],
+        )
+        kids = Child.objects.fetch_all_parents().order_by('id')
+        self.assertEqual(
+            [(kid.child_name, kid.para_name, kid.parb_name) for kid in kids],
+            [('X1', 'A0', 'B1'), ('X2', 'A2', 'B2')],
+        )
+
+
+class BatchFetchParentsTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            Child.objects.create(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+
+    def test_parent_fetched_for_all_siblings(self):
+        with self.assertNumQueries(2):
+            names = [c.para_name for c in Child.objects.batch_fetch_parents().order_by('id')]
+        self.assertEqual(names, [f'A{i}' for i in range(5)])
+        with self.assertNumQueries(4):
+            # Without batching, one query per object
+            list(c.para_name for c in Child.objects.order_by('id')[:3])
+
+    def test_each_parent_fetched_once(self):
+        with self.assertNumQueries(3):
+            parents = [(c.para_name, c.para_zit, c.parb_name) for c in Child.objects.batch_fetch_parents()]
+        self.assertEqual(len(parents), 5)
+
+    def test_fields_set_on_object_are_kept(self):
+        children = list(Child.objects.batch_fetch_parents().order_by('id'))
+        children[1].para_name = 'Changed'
+        with self.assertNumQueries(1):
+            self.assertEqual(children[0].para_name, 'A0')
+            self.assertEqual(children[1].para_name, 'Changed')
+            self.assertIs(children[1].para_zit, True)
+
+    def test_disabled(self):
+        children = list(Child.objects.batch_fetch_parents().batch_fetch_parents(False))
+        with self.assertNumQueries(5):
+            for c in children:
+                c.para_name
+
+    def test_refresh_loaded_fields(self):
+        """Explicitly refreshing fields which are already loaded does not involve the siblings"""
+        children = list(Child.objects.batch_fetch_parents().select_related('parenta_ptr').order_by('id'))
+        Child.objects.filter(child_name='X0').update(para_name='Z')
+        with self.assertNumQueries(1):
+            children[0].refresh_from_db(fields=['para_name'])
+        self.assertEqual(children[0].para_name, 'Z')
+        self.assertEqual(children[1].para_name, 'A1')
+
+    def test_pickled_object_detached(self):
+        children = list(Child.objects.batch_fetch_parents().order_by('id'))
+        detached = pickle.loads(pickle.dumps(children[0]))
+        with self.assertNumQueries(1):
+            self.assertEqual(detached.para_name, 'A0')
+        self.assertIsNone(children[1].getattr_if_loaded('para_name'))
+
+
+class PrefetchParentsTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            Child.objects.create(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+
+    def test_prefetch_by_ptr_name(self):
+        with self.assertNumQueries(2):
+            children = list(Child.objects.prefetch_parents('parenta_ptr').order_by('id'))
+        with self.assertNumQueries(0):
+            self.assertEqual([(c.para_name, c.para_zit) for c in children], [(f'A{i}', True) for i in range(5)])
+        with self.assertNumQueries(1):
+            self.assertEqual(children[0].parb_name, 'B0')
+
+    def test_prefetch_by_model(self):
+        with self.assertNumQueries(3):
+            children = list(Child.objects.prefetch_parents(ParentB, ParentC).order_by('id'))
+        with self.assertNumQueries(0):
+            self.assertEqual([c.parb_name + c.parc_name for c in children], [f'B{i}C{i}' for i in range(5)])
+
+    def test_iterator(self):
+        qs = Child.objects.prefetch_parents(ParentB).order_by('id')
+        for chunk_size, queries in ((None, 2), (2, 4)):
+            with self.subTest(chunk_size=chunk_size), self.assertNumQueries(queries):
+                names = [c.parb_name for c in qs.iterator(chunk_size)]
+                self.assertEqual(names, [f'B{i}' for i in range(5)])
+
+    def test_prefetch_all(self):
+        with self.assertNumQueries(4):
+            c = Child.objects.prefetch_parents().get(child_name='X3')
+            self.assertEqual((c.para_name, c.parb_name, c.parc_name), ('A3', 'B3', 'C3'))
+
+    def test_prefetch_cancels_join(self):
+        qs = Child.objects.select_related('parenta_ptr', 'parentb_ptr').prefetch_parents('parenta_ptr')
+        self.assertEqual(qs._with_parents, {ParentB})
+        with self.assertNumQueries(2):
+            children = list(qs)
+            self.assertEqual(len(children), 5)
+            for c in children:
+                c.para_name, c.parb_name
+
+    def test_join_cancels_prefetch(self):
+        qs = Child.objects.prefetch_parents('parenta_ptr', 'parentb_ptr').select_related('parenta_ptr')
+        self.assertEqual(qs._prefetch_parents, {ParentB})
+        self.assertEqual(Child.objects.prefetch_parents().fetch_all_parents()._prefetch_parents, set())
+        with self.assertNumQueries(2):
+            for c in qs:
+                c.para_name, c.parb_name
+
+    def test_prefetch_none_clears(self):
+        qs = Child.objects.prefetch_parents().prefetch_parents(None)
+        with self.assertNumQueries(1):
+            list(qs)
+
+    def test_not_a_parent(self):
+        with self.assertRaisesMessage(ValueError, "'user' is not a parent link of testapp.Child"):
+            Child.objects.prefetch_parents('user')
+        with self.assertRaisesMessage(ValueError, "testapp.Nephew is not a parent of testapp.Child"):
+            Child.objects.prefetch_parents(Nephew)
+
+
+class AdaptiveParentsTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            Child.objects.create(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+        self.profile = ParentUsageProfile()
+
+    def use_para(self, **kwargs):
+        return [c.para_name for c in Child.objects.adaptive_parents(profile=self.profile, **kwargs)]
+
+    def test_learns_by_call_site(self):
+        with self.assertNumQueries(4):
+            self.use_para()
+        self.assertEqual(list(self.profile.export().values()), [['testapp.ParentA']])
+        # The same call site now prefetches...
+        with self.assertNumQueries(2):
+            self.use_para()
+        # ...but another does not
+        with self.assertNumQueries(4):
+            [c.para_name for c in Child.objects.adaptive_parents(profile=self.profile)]
+
+    def test_learns_by_name(self):
+        with self.assertNumQueries(4):
+            [c.parb_name for c in Child.objects.adaptive_parents('b-users', profile=self.profile)]
+        self.assertEqual(self.profile.export(), {'b-users': ['testapp.ParentB']})
+        with self.assertNumQueries(1):
+            children = list(Child.objects.adaptive_parents('b-users', join=True, profile=self.profile))
+            self.assertEqual([c.parb_name for c in children], ['B0', 'B1', 'B2'])
+
+    def test_get(self):
+        for _ in range(2):
+            with self.assertNumQueries(2):
+                c = Child.objects.adaptive_parents('get', profile=self.profile).get(child_name='X1')
+                self.assertEqual(c.parc_name, 'C1')
+
+    def test_threshold(self):
+        for _ in range(2):
+            list(Child.objects.adaptive_parents('sometimes', profile=self.profile))
+        self.use_para(origin='sometimes')
+        self.assertEqual(self.profile.parents_for('sometimes'), set())
+        self.use_para(origin='sometimes')
+        self.assertEqual(self.profile.parents_for('sometimes'), {'testapp.ParentA'})
+
+    def test_decay(self):
+        """Fetches from long ago count less than recent ones"""
+        profile = ParentUsageProfile(half_life=1)
+        for _ in range(3):
+            list(Child.objects.adaptive_parents('decaying', profile=profile))
+        for _ in range(10):
+            list(Child.objects.adaptive_parents('elsewhere', profile=profile))
+        [c.para_name for c in Child.objects.adaptive_parents('decaying', profile=profile)]
+        self.assertEqual(profile.parents_for('decaying'), {'testapp.ParentA'})
+
+    def test_unused_parent_dropped(self):
+        """A selected parent which stops being used is dropped, as probe fetches show"""
+        profile = ParentUsageProfile(threshold=0.4, probe_interval=2)
+        [c.para_name for c in Child.objects.adaptive_parents('dropping', profile=profile)]
+        self.assertEqual(profile.parents_for('dropping'), {'testapp.ParentA'})
+        for fetched_up_front in (0, 1, 0):
+            with self.assertNumQueries(1 + fetched_up_front):
+                list(Child.objects.adaptive_parents('dropping', profile=profile))
+        self.assertEqual(profile.parents_for('dropping'), set())
+
+    def test_queryset_not_changed(self):
+        frozen = ParentUsageProfile.from_export({'joined': ['testapp.ParentB']})
+        queryset = Child.objects.adaptive_parents('joined', join=True, profile=frozen)
+        sql = str(queryset.query)
+        with self.assertNumQueries(1):
+            self.assertEqual([c.parb_name for c in queryset], ['B0', 'B1', 'B2'])
+        self.assertEqual(str(queryset.query), sql)
+
+    def test_values_on_learned_origin(self):
+        for join in (False, True):
+            with self.subTest(join=join):
+                self.use_para(origin='values', join=join)
+                queryset = Child.objects.adaptive_parents('values', join=join, profile=self.profile)
+                self.assertEqual(len(queryset.values_list('id', flat=True)), 3)
+                self.assertEqual([c['child_name'] for c in queryset.values('child_name')], ['X0', 'X1', 'X2'])
+
+    def test_size_bound(self):
+        profile = ParentUsageProfile(max_origins=4)
+        for i in range(6):
+            [c.para_name for c in Child.objects.adaptive_parents(f'origin-{i}', profile=profile)]
+        self.assertLessEqual(len(profile.export()), 4)
+        self.assertIn('origin-5', profile.export())
+
+    def test_frozen(self):
+        frozen = ParentUsageProfile.from_export({'frozen': ['testapp.ParentC']})
+        self.assertTrue(frozen.frozen)
+        with self.assertNumQueries(3):
+            children = list(Child.objects.adaptive_parents('frozen', profile=frozen))
+            self.assertEqual([c.parc_name for c in children], ['C0', 'C1', 'C2'])
+            self.assertEqual(children[0].para_name, 'A0')
+        self.assertEqual(frozen.export(), {'frozen': ['testapp.ParentC']})
+
+
+class PartLoadDetectionTestCase(PartLoadAssertionsMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            Child.objects.create(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+
+    def test_warn(self):
+        with PartLoadDetector():
+            children = list(Child.objects.all())
+            children[0].para_name
+            with self.assertWarnsMessage(
+                RepeatedPartLoadWarning,
+                "testapp.ParentA was loaded separately for 2 testapp.Child objects fetched together"
+            ) as cm:
+                line = inspect.currentframe().f_lineno + 1
+                children[1].para_name
+            self.assertIn('children[1].para_name', str(cm.warning))
+            # Attributed to the access, so that warning filters by module apply to it
+            self.assertEqual((cm.filename, cm.lineno), (__file__, line))
+            # Reported once per queryset and parent
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                children[2].para_name
+                children[0].parb_name
+
+    def test_log(self):
+        with PartLoadDetector('log', threshold=3):
+            children = list(Child.objects.all())
+            with self.assertLogs('bdmodels.detection') as cm:
+                for c in children:
+                    c.parc_zit
+        self.assertEqual(len(cm.records), 1)
+        self.assertIn("testapp.ParentC was loaded separately for 3 testapp.Child objects", cm.output[0])
+
+    def test_strict(self):
+        with PartLoadDetector('raise'):
+            with self.assertRaises(RepeatedPartLoad):
+                for c in Child.objects.all():
+                    c.para_name
+
+    def test_no_report(self):
+        with PartLoadDetector('raise'):
+            for c in Child.objects.select_related('parenta_ptr'):
+                c.para_name
+            for c in Child.objects.batch_fetch_parents():
+                c.parb_name
+            for child_name in ('X0', 'X1'):
+                Child.objects.get(child_name=child_name).parc_name
+        # Objects fetched while the detector is not installed are not watched
+        children = list(Child.objects.all())
+        with PartLoadDetector('raise'):
+            for c in children:
+                c.para_name
+
+    def test_assert_parts_loaded(self):
+        with self.assertPartsLoaded(Child, {ParentA: 1, ParentB: 0}):
+            for c in Child.objects.batch_fetch_parents():
+                c.para_name
+        with self.assertPartsLoaded(Child, {}):
+            for c in ChildProxy.objects.select_related():
+                c.para_name
+
+    def test_assert_parts_loaded_fails(self):
+        with self.assertRaisesMessage(
+            AssertionError,
+            "Parts of testapp.Child loaded: testapp.ParentA: 3; expected: testapp.ParentA: 1"
+        ):
+            with self.assertPartsLoaded(Child, {ParentA: 1}):
+                for c in ChildProxy.objects.all():
+                    c.para_name
+
+
+class ParentLoadQueryTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.child = Child.objects.create(para_name='A', parb_name='B', parc_name='C', child_name='Xerxes')
+
+    def test_deferred_parent_loaded_from_its_table_only(self):
+        c = Child.objects.get(pk=self.child.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(c.para_name, 'A')
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertIn(ParentA._meta.db_table, sql)
+        self.assertNotIn(Child._meta.db_table, sql)
+
+    def test_prefetched_parent_loaded_from_its_table_only(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(Child.objects.prefetch_parents('parentb_ptr'))
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn(Child._meta.db_table, queries[1]['sql'])
+
+    def test_refresh_set_fields(self):
+        c = Child.objects.get(pk=self.child.pk)
+        c.para_name = 'Z'
+        c.parb_name = 'Y'
+        with self.assertNumQueries(2):
+            c.refresh_from_db(fields=['para_zit'])
+            c.refresh_from_db(fields=['parb_name'])
+        self.assertEqual((c.para_name, c.para_zit, c.parb_name), ('Z', True, 'B'))
+
+    def test_missing_parent_row(self):
+        c = Child.objects.get(pk=self.child.pk)
+        ParentA.objects.filter(pk=c.pk).delete()
+        with self.assertRaises(Child.DoesNotExist):
+            c.para_name
+
+
+class ParentLinkAccessTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            Child.objects.create(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+
+    def test_parent_built_from_fetched_fields(self):
+        for qs in (
+            Child.objects.select_related('parenta_ptr'),
+            Child.objects.fetch_all_parents(),
+            Child.objects.prefetch_parents('parenta_ptr'),
+        ):
+            c = qs.get(child_name='X1')
+            with self.assertNumQueries(0):
+                parent = c.parenta_ptr
+            self.assertIsInstance(parent, ParentA)
+            self.assertEqual((parent.pk, parent.para_name), (c.pk, 'A1'))
+            self.assertIs(parent._state.adding, False)
+
+    def test_deferred_parent_loaded_into_child(self):
+        c = Child.objects.get(child_name='X1')
+        with self.assertNumQueries(1):
+            parent = c.parentb_ptr
+            self.assertEqual(parent.parb_name, 'B1')
+            self.assertEqual(c.parb_name, 'B1')
+
+    def test_deferred_parent_batched(self):
+        with self.assertNumQueries(2):
+            names = [c.parentc_ptr.parc_name for c in Child.objects.batch_fetch_parents().order_by('id')]
+        self.assertEqual(names, ['C0', 'C1', 'C2'])
+
+
+class ChangeTrackingTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.child = Child.objects.create(para_name='A', parb_name='B', parc_name='C', child_name='X')
+
+    def assertUpdatedTables(self, queries, tables):
+        updated = {query['sql'].split()[1].strip('"`') for query in queries if query['sql'].startswith('UPDATE')}
+        self.assertEqual(updated, {model._meta.db_table for model in tables})
+
+    def test_untracked_saves_all(self):
+        c = Child.objects.fetch_all_parents().get(pk=self.child.pk)
+        c.parb_name = 'BB'
+        with CaptureQueriesContext(connection) as ctx:
+            c.save()
+        self.assertUpdatedTables(ctx.captured_queries, [Child, ParentA, ParentB, ParentC])
+
+    def test_changed_fields(self):
+        c = TrackedChild.objects.fetch_all_parents().get(pk=self.child.pk)
+        self.assertEqual(c.get_changed_fields(), set())
+        c.parb_name = 'BB'
+        c.child_name = 'X'
+        self.assertEqual(c.get_changed_fields(), {'parb_name'})
+        self.assertEqual(Child.objects.get(pk=self.child.pk).get_changed_fields(), {'child_name', 'user'})
+
+    def test_save_changed_part_only(self):
+        c = TrackedChild.objects.fetch_all_parents().get(pk=self.child.pk)
+        c.parb_name = 'BB'
+        with CaptureQueriesContext(connection) as ctx:
+            c.save()
+        self.assertUpdatedTables(ctx.captured_queries, [ParentB])
+        self.assertEqual(ParentB.objects.get(pk=self.child.pk).parb_name, 'BB')
+        self.assertEqual(c.get_changed_fields(), set())
+
+    def test_plain_date_field_part_skipped(self):
+        ParentC.objects.filter(pk=self.child.pk).update(parc_date=datetime.date(2020, 1, 1))
+        c = TrackedChild.objects.fetch_all_parents().get(pk=self.child.pk)
+        c.para_name = 'AA'
+        with CaptureQueriesContext(connection) as ctx:
+            c.save()
+        # ParentC has a DateField, but it is not auto_now
+        self.assertUpdatedTables(ctx.captured_queries, [ParentA])
+
+    def test_auto_now_part_saved(self):
+        obj = TimeStampedChild.objects.create(para_name='A', parb_name='B', parc_name='C', child_name='X')
+        with mock.patch.object(TimeStampedChild, 'track_changes', True):
+            c = TimeStampedChild.objects.fetch_all_parents().get(pk=obj.pk)
+            c.para_name = 'AA'
+            with CaptureQueriesContext(connection) as ctx:
+                c.save()
+        self.assertUpdatedTables(ctx.captured_queries, [TimeStampedChild, ParentA])
+        self.assertGreater(TimeStampedChild.objects.get(pk=obj.pk).last_modified, obj.last_modified)
+
+    def test_save_unchanged(self):
+        c = TrackedChild.objects.fetch_all_parents().get(pk=self.child.pk)
+        with self.assertNumQueries(0):
+            c.save()
+
+    def test_save_lazily_loaded_part(self):
+        c = TrackedChild.objects.get(pk=self.child.pk)
+        c.parc_name = c.parc_name + 'C'
+        with CaptureQueriesContext(connection) as ctx:
+            c.save()
+        self.assertUpdatedTables(ctx.captured_queries, [ParentC])
+        self.assertEqual(ParentC.objects.get(pk=self.child.pk).parc_name, 'CC')
+
+    def test_explicit_update_fields(self):
+        c = TrackedChild.objects.fetch_all_parents().get(pk=self.child.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            c.save(update_fields=['para_name'])
+        self.assertUpdatedTables(ctx.captured_queries, [ParentA])
+
+    def test_copy_by_clearing_pk(self):
+        c = TrackedChild.objects.fetch_all_parents().get(pk=self.child.pk)
+        c.pk = None
+        c.save()
+        self.assertIsNotNone(c.pk)
+        self.assertNotEqual(c.pk, self.child.pk)
+        self.assertEqual(Child.objects.count(), 2)
+        self.assertEqual(Child.objects.fetch_all_parents().get(pk=c.pk).parb_name, 'B')
+
+    def test_mutable_value(self):
+        c = TrackedChild.objects.get(pk=self.child.pk)
+        c.child_name = ['X']
+        c._record_loaded_values([TrackedChild._meta.get_field('child_name')])
+        self.assertEqual(c.get_changed_fields(), set())
+        c.child_name.append('Y')
+        self.assertEqual(c.get_changed_fields(), {'child_name'})
+
+
+class SparsePartTestCase(TestCase):
+
+    def test_create_with_defaults(self):
+        c = SparseChild.objects.create(para_name='A', child_name='X')
+        self.assertFalse(ParentD.objects.exists())
+        self.assertEqual(ParentA.objects.get(pk=c.pk).para_name, 'A')
+        self.assertEqual((c.pard_name, c.pard_count), ('', 0))
+
+    def test_create_with_values(self):
+        c = SparseChild.objects.create(para_name='A', pard_count=3, child_name='X')
+        self.assertEqual(ParentD.objects.get(pk=c.pk).pard_count, 3)
+
+    def test_load_missing_part(self):
+        c = SparseChild.objects.create(para_name='A', child_name='X')
+        for qs in (
+            SparseChild.objects.all(),
+            SparseChild.objects.fetch_all_parents(),
+            SparseChild.objects.prefetch_parents(),
+            SparseChild.objects.batch_fetch_parents(),
+        ):
+            loaded = qs.get(pk=c.pk)
+            self.assertEqual((loaded.pard_name, loaded.pard_count, loaded.child_name), ('', 0, 'X'))
+            self.assertEqual(loaded.parentd_ptr.pk, c.pk)
+
+    def test_joined_as_outer(self):
+        SparseChild.objects.create(para_name='A', child_name='X')
+        SparseChild.objects.create(para_name='B', pard_name='D', child_name='Y')
+        with self.assertNumQueries(1):
+            names = [(c.child_name, c.pard_name) for c in SparseChild.objects.fetch_all_parents().order_by('id')]
+        self.assertEqual(names, [('X', ''), ('Y', 'D')])
+
+    def test_first_non_default_write(self):
+        c = SparseChild.objects.create(para_name='A', child_name='X')
+        loaded = SparseChild.objects.get(pk=c.pk)
+        loaded.child_name = 'Y'
+        loaded.save()
+        self.assertFalse(ParentD.objects.exists())
+        loaded.pard_name = 'D'
+        loaded.save(update_fields=['pard_name'])
+        self.assertEqual(ParentD.objects.get(pk=c.pk).pard_name, 'D')
+        loaded = SparseChild.objects.get(pk=c.pk)
+        loaded.pard_count = 2
+        loaded.save()
+        self.assertEqual(ParentD.objects.values_list('pard_name', 'pard_count').get(pk=c.pk), ('D', 2))
+
+    def test_create_missing_row_by_insert(self):
+        c = SparseChild.objects.create(para_name='A', child_name='X')
+        loaded = SparseChild.objects.fetch_all_parents().get(pk=c.pk)
+        loaded.pard_name = 'D'
+        with CaptureQueriesContext(connection) as ctx:
+            loaded.save(update_fields=['pard_name'])
+        # Just the INSERT, no UPDATE of the row known to be missing
+        self.assertEqual([query['sql'].split()[0] for query in ctx.captured_queries], ['INSERT'])
+        self.assertEqual(ParentD.objects.get(pk=c.pk).pard_name, 'D')
+
+    def test_bulk_create(self):
+        objs = SparseChild.objects.bulk_create([
+            SparseChild(para_name='A', child_name='X'),
+            SparseChild(para_name='B', pard_count=1, child_name='Y'),
+        ])
+        self.assertEqual(ParentA.objects.count(), 2)
+        self.assertEqual(list(ParentD.objects.values_list('pk', flat=True)), [objs[1].pk])
+
+    def test_delete(self):
+        c = SparseChild.objects.create(para_name='A', child_name='X')
+        c.delete()
+        self.assertFalse(SparseChild.objects.exists())
+        self.assertFalse(ParentA.objects.exists())
+
+
+class QuerySetUpdateTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            Child.objects.create(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+
+    def test_parent_fields_updated_with_subquery(self):
+        with CaptureQueriesContext(connection) as ctx:
+            rows = Child.objects.filter(child_name__in=['X0', 'X1']).update(para_name='Z', parb_zit=False)
+        self.assertEqual(rows, 2)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertTrue(all(query['sql'].startswith('UPDATE') for query in ctx.captured_queries))
+        self.assertEqual(
+            list(Child.objects.fetch_all_parents().order_by('id').values_list('para_name', 'parb_zit')),
+            [('Z', False), ('Z', False), ('A2', True)],
+        )
+
+    def test_core_and_parent_fields(self):
+        rows = Child.objects.filter(child_name='X2').update(child_name='Y', parc_name='Q')
+        self.assertEqual(rows, 1)
+        c = Child.objects.fetch_all_parents().get(child_name='Y')
+        self.assertEqual(c.parc_name, 'Q')
+
+    def test_filter_on_updated_field(self):
+        rows = Child.objects.filter(para_name='A1').update(para_name='Z', parb_name='Y', child_name='W')
+        self.assertEqual(rows, 1)
+        c = Child.objects.fetch_all_parents().get(para_name='Z')
+        self.assertEqual((c.parb_name, c.child_name), ('Y', 'W'))
+
+    def test_filter_on_several_updated_tables(self):
+        rows = Child.objects.filter(para_name='A1', parb_name='B1').update(para_name='Z', parb_name='Y')
+        self.assertEqual(rows, 1)
+        self.assertEqual(ParentB.objects.get(parb_name='Y').pk, ParentA.objects.get(para_name='Z').pk)
+
+    def test_sparse_missing_parts_created(self):
+        SparseChild.objects.create(para_name='A', child_name='X')
+        SparseChild.objects.create(para_name='B', pard_name='D', child_name='Y')
+        rows = SparseChild.objects.update(pard_count=5)
+        self.assertEqual(rows, 2)
+        self.assertEqual(
+            list(SparseChild.objects.fetch_all_parents().order_by('id').values_list('pard_name', 'pard_count')),
+            [('', 5), ('D', 5)],
+        )
+
+    def test_value_from_other_part(self):
+        rows = Child.objects.filter(child_name='X1').update(para_name=Concat(F('child_name'), F('parb_name')))
+        self.assertEqual(rows, 1)
+        self.assertEqual(ParentA.objects.get(para_name='X1B1').pk, Child.objects.get(child_name='X1').pk)
+
+    def test_core_value_from_part(self):
+        Child.objects.update(child_name=F('parc_name'))
+        self.assertEqual(
+            list(Child.objects.order_by('id').values_list('child_name', flat=True)), ['C0', 'C1', 'C2'],
+        )
+
+    def test_values_read_before_update(self):
+        # Each table is updated before the tables its values are read from
+        Child.objects.filter(child_name='X0').update(para_name=F('parb_name'), parb_name=F('child_name'))
+        c = Child.objects.fetch_all_parents().get(child_name='X0')
+        self.assertEqual((c.para_name, c.parb_name), ('B0', 'X0'))
+
+    def test_swap_unsupported(self):
+        # Values read from each other's tables -- cannot be ordered, left to Django
+        with self.assertRaises(FieldError):
+            Child.objects.update(para_name=F('parb_name'), parb_name=F('para_name'))
+
+
+class BulkUpdateTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            Child.objects.create(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+
+    def test_table_per_part(self):
+        kids = list(Child.objects.fetch_all_parents().order_by('child_name'))
+        for kid in kids:
+            kid.child_name += '1'
+            kid.para_name += '1'
+            kid.parb_zit = False
+        with CaptureQueriesContext(connection) as ctx:
+            rows = Child.objects.bulk_update(kids, ['child_name', 'para_name', 'parb_zit'])
+        self.assertEqual(rows, 3)
+        # One update for each table with fields, none for ParentC
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertTrue(all(query['sql'].startswith('UPDATE') for query in ctx.captured_queries))
+        kids = Child.objects.fetch_all_parents().order_by('child_name')
+        self.assertEqual(
+            [(kid.child_name, kid.para_name, kid.parb_zit, kid.parc_name) for kid in kids],
+            [(f'X{i}1', f'A{i}1', False, f'C{i}') for i in range(3)],
+        )
+
+    def test_batches_per_table(self):
+        kids = list(Child.objects.order_by('child_name'))
+        for kid in kids:
+            kid.parc_name = 'Z'
+        with self.assertNumQueries(2):
+            Child.objects.bulk_update(kids, ['parc_name'], batch_size=2)
+        self.assertEqual(ParentC.objects.filter(parc_name='Z').count(), 3)
+
+    def test_filtered(self):
+        kids = list(Child.objects.order_by('child_name'))
+        for kid in kids:
+            kid.para_name = 'Z'
+        rows = Child.objects.filter(child_name__in=['X0', 'X1']).bulk_update(kids, ['para_name'])
+        self.assertEqual(rows, 2)
+        self.assertEqual(ParentA.objects.filter(para_name='Z').count(), 2)
+
+    def test_sparse_part(self):
+        kid = SparseChild.objects.create(para_name='A', child_name='X')
+        kid.pard_name = 'D'
+        SparseChild.objects.bulk_update([kid], ['pard_name'])
+        self.assertEqual(ParentD.objects.get(did=kid.pk).pard_name, 'D')
+
+
+class PKAllocatorTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.existing = Child.objects.create(para_name='A', parb_name='B', parc_name='C', child_name='X')
+        self.allocator = HiLoAllocator(block_size=10)
+        patcher = mock.patch.object(Child, 'pk_allocator', self.allocator)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_block_above_existing_pks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pks = self.allocator.allocate(Child, 3, 'default')
+        first = (self.existing.pk // 10 + 1) * 10
+        self.assertEqual(pks, [first, first + 1, first + 2])
+        # The rest of the block is handed out from memory
+        with self.assertNumQueries(0):
+            pks = self.allocator.allocate(Child, 7, 'default')
+        self.assertEqual(pks, list(range(first + 3, first + 10)))
+        with self.captureOnCommitCallbacks(execute=True):
+            pks = self.allocator.allocate(Child, 12, 'default')
+        self.assertEqual(pks, list(range(first + 10, first + 22)))
+
+    def test_block_kept_on_commit_only(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.allocator.allocate(Child, 3, 'default')
+        self.assertEqual(len(callbacks), 1)
+        with self.captureOnCommitCallbacks():
+            with self.assertNumQueries(4):
+                # A new block is reserved: select and update the counter, in a savepoint
+                self.allocator.allocate(Child, 1, 'default')
+
+    def test_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.allocator.allocate(Child, 1, 'default')
+        child = Child(para_name='A1', parb_name='B1', parc_name='C1', child_name='X1')
+        with self.assertNumQueries(7):
+            # Inserted right away, with no block reservation
+            child.save()
+        self.assertEqual(child.pk, (self.existing.pk // 10 + 1) * 10 + 1)
+        child = Child.objects.fetch_all_parents().get(pk=child.pk)
+        self.assertEqual((child.para_name, child.parb_name, child.child_name), ('A1', 'B1', 'X1'))
+
+    def test_bulk_create(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.allocator.allocate(Child, 1, 'default')
+        children = [
+            Child(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+            for i in range(3)
+        ]
+        with self.assertNumQueries(4):
+            Child.objects.bulk_create(children)
+        first = (self.existing.pk // 10 + 1) * 10 + 1
+        self.assertEqual([child.pk for child in children], [first, first + 1, first + 2])
+        self.assertEqual(ParentC.objects.get(cid=first + 2).parc_name, 'C2')
+
+
+class SingleStatementInsertTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(Child, 'single_statement_insert', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @skipUnless(connection.vendor == 'postgresql', "Data-modifying WITH clauses are a PostgreSQL feature")
+    def test_insert(self):
+        child = Child(para_name='A', parb_name='B', parc_name='C', child_name='X')
+        with self.assertNumQueries(1):
+            child.save()
+        self.assertEqual((child.aid, child.bid, child.cid), (child.pk, child.pk, child.pk))
+        child = Child.objects.fetch_all_parents().get(pk=child.pk)
+        self.assertEqual((child.para_name, child.parb_name, child.parc_name), ('A', 'B', 'C'))
+
+    @skipUnless(connection.vendor == 'postgresql', "Data-modifying WITH clauses are a PostgreSQL feature")
+    def test_insert_sparse_part_skipped(self):
+        with mock.patch.object(SparseChild, 'single_statement_insert', True):
+            child = SparseChild.objects.create(para_name='A', child_name='X')
+            self.assertFalse(ParentD.objects.filter(did=child.pk).exists())
+            child = SparseChild.objects.create(para_name='A', pard_name='D', child_name='X')
+            self.assertEqual(ParentD.objects.get(did=child.pk).pard_name, 'D')
+
+    @skipIf(connection.vendor == 'postgresql', "Tests the fallback on other databases")
+    def test_fallback(self):
+        child = Child(para_name='A', parb_name='B', parc_name='C', child_name='X')
+        with CaptureQueriesContext(connection) as queries:
+            child.save()
+        self.assertGreater(len(queries), 1)
+        child = Child.objects.fetch_all_parents().get(pk=child.pk)
+        self.assertEqual((child.para_name, child.parb_name, child.parc_name), ('A', 'B', 'C'))
+
+
+class UnitOfWorkTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for name in 'XYZ':
+            Child.objects.create(para_name='A', parb_name='B', parc_name='C', child_name=name)
+
+    def record_signals(self):
+        sent = []
+
+        def receiver(signal, instance, **kwargs):
+            sent.append((signal, instance.child_name))
+
+        for signal in (signals.pre_save, signals.post_save):
+            signal.connect(receiver, sender=Child)
+            self.addCleanup(signal.disconnect, receiver, sender=Child)
+        return sent
+
+    def test_saves_written_together(self):
+        sent = self.record_signals()
+        kids = list(Child.objects.order_by('child_name'))
+        with unit_of_work() as work:
+            with self.assertNumQueries(0):
+                for kid in kids:
+                    kid.child_name += '1'
+                    kid.para_name = kid.child_name
+                    kid.save()
+                kids[0].save(update_fields=['child_name'])
+            self.assertEqual(len(work), 3)
+            self.assertEqual(sent, [])
+            self.assertFalse(Child.objects.filter(child_name='X1').exists())
+        self.assertEqual(
+            sent,
+            [(signals.pre_save, name) for name in ('X1', 'Y1', 'Z1')] +
+            [(signals.post_save, name) for name in ('X1', 'Y1', 'Z1')],
+        )
+        kids = Child.objects.fetch_all_parents().order_by('child_name')
+        self.assertEqual([(kid.child_name, kid.para_name) for kid in kids], [('X1', 'X1'), ('Y1', 'Y1'), ('Z1', 'Z1')])
+
+    def test_discarded_on_error(self):
+        kid = Child.objects.get(child_name='X')
+        with self.assertRaises(ZeroDivisionError):
+            with unit_of_work():
+                kid.child_name = 'X1'
+                kid.save()
+                1 / 0
+        self.assertTrue(Child.objects.filter(child_name='X').exists())
+
+    def test_new_object_flushes(self):
+        sent = self.record_signals()
+        kid = Child.objects.get(child_name='X')
+        with unit_of_work() as work:
+            kid.child_name = 'X1'
+            kid.save()
+            # Without an allocator, a new object cannot be recorded -- it is saved,
+            # after the recorded saves
+            Child.objects.create(para_name='A', parb_name='B', parc_name='C', child_name='W')
+            self.assertEqual(len(work), 0)
+        self.assertEqual(
+            sent,
+            [(signals.pre_save, 'X1'), (signals.post_save, 'X1'), (signals.pre_save, 'W'), (signals.post_save, 'W')],
+        )
+        self.assertTrue(Child.objects.filter(child_name='X1').exists())
+
+    def test_new_objects_with_allocator(self):
+        with mock.patch.object(Child, 'pk_allocator', HiLoAllocator(block_size=10)):
+            with unit_of_work() as work:
+                kids = [
+                    Child(para_name='A', parb_name='B', parc_name='C', child_name=f'W{i}')
+                    for i in range(3)
+                ]
+                for kid in kids:
+                    kid.save()
+                self.assertEqual(len(work), 3)
+                self.assertTrue(all(kid.pk for kid in kids))
+        kids = Child.objects.fetch_all_parents().filter(child_name__startswith='W').order_by('child_name')
+        self.assertEqual([(kid.child_name, kid.parc_name) for kid in kids], [('W0', 'C'), ('W1', 'C'), ('W2', 'C')])
+
+
+class FastDeleteTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            Child.objects.create(para_name=f'A{i}', parb_name=f'B{i}', parc_name=f'C{i}', child_name=f'X{i}')
+
+    def assertRemaining(self, names):
+        self.assertEqual(list(Child.objects.order_by('id').values_list('child_name', flat=True)), names)
+        for parent in (ParentA, ParentB, ParentC):
+            self.assertEqual(parent.objects.count(), len(names))
+
+    def test_queryset(self):
+        deleted = Child.objects.filter(child_name__in=['X0', 'X2']).delete()
+        self.assertEqual(deleted, (8, {
+            'testapp.Child': 2, 'testapp.ParentA': 2, 'testapp.ParentB': 2, 'testapp.ParentC': 2,
+        }))
+        self.assertRemaining(['X1'])
+
+    def test_object(self):
+        c = Child.objects.get(child_name='X1')
+        self.assertEqual(c.delete()[0], 4)
+        self.assertIsNone(c.pk)
+        self.assertRemaining(['X0', 'X2'])
+
+    def test_keep_parents(self):
+        c = Child.objects.get(child_name='X1')
+        with self.assertNumQueries(1):
+            c.delete(keep_parents=True)
+        self.assertEqual(ParentA.objects.count(), 3)
+
+    def test_filter_on_parent_collects(self):
+        with self.assertNumQueries(5):
+            Child.objects.filter(para_name='A1').delete()
+        self.assertRemaining(['X0', 'X2'])
+
+    def test_signal_listeners_collect(self):
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+
+        signals.post_delete.connect(receiver, sender=ParentB)
+        try:
+            Child.objects.filter(child_name='X0').delete()
+        finally:
+            signals.post_delete.disconnect(receiver, sender=ParentB)
+        self.assertEqual(len(deleted), 1)
+        self.assertRemaining(['X1', 'X2'])
+
+
+class CheckPartsCommandTestCase(TestCase):
+
+    def check_parts(self, **options):
+        out = StringIO()
+        call_command('checkparts', 'testapp.SparseChild', chunk_size=1, stdout=out, **options)
+        return out.getvalue().splitlines()
+
+    def test_check_and_repair(self):
+        broken = SparseChild.objects.create(para_name='A', child_name='X')
+        SparseChild.objects.create(para_name='B', child_name='Y')
+        SparseChild.objects.create(para_name='C', pard_count=1, child_name='Z')
+        ParentA.objects.filter(pk=broken.pk).delete()
+        ParentA.objects.create(aid=100, para_name='orphan')
+        ParentD.objects.create(did=101)
+        expected = [
+            "testapp.SparseChild: 1 objects without rows in testapp_parenta",
+            "testapp.ParentA: 1 rows without objects",
+            "testapp.ParentD: 1 rows without objects",
+        ]
+        # The missing rows of the sparse part are not reported
+        self.assertEqual(self.check_parts(), expected)
+        # Orphans are only deleted from the parts given
+        self.assertEqual(
+            self.check_parts(create_missing=True, delete_orphans=['testapp.ParentD']),
+            [expected[0] + ", created", expected[1], expected[2] + ", deleted"],
+        )
+        self.assertEqual(ParentA.objects.get(pk=broken.pk).para_name, '')
+        self.assertEqual(ParentD.objects.count(), 1)
+        self.assertEqual(self.check_parts(delete_orphans=['testapp.ParentA']), [expected[1] + ", deleted"])
+        self.assertEqual(self.check_parts(), ["No missing or orphan rows found."])
+
+    def test_delete_orphans_of_other_models(self):
+        with self.assertRaisesMessage(CommandError, "Not a part of the checked models: testapp.ParentB"):
+            self.check_parts(delete_orphans=['testapp.ParentB'])
@@ -2,9 +2,14 @@
 
 from django.db import migrations
 
+from bdmodels import migration_ops
+
 
 class Migration(migrations.Migration):
 
+    # Space cannot be reclaimed in a transaction
+    atomic = False
+
     dependencies = [
         ('testmigs', '0003_copy_big_model'),
     ]
@@ -18,4 +23,7 @@ class Migration(migrations.Migration):
             model_name='bigmodel',
             name='d',
         ),
+        migration_ops.ReclaimSpace(
+            model_name='bigmodel',
+        ),
     ]
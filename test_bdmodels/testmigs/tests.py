@@ -1,7 +1,16 @@
+import itertools
+from unittest import mock, skipIf, skipUnless
+
 from django.core.management import call_command
-from django.db import connection
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
 from django.test import TransactionTestCase
 
+from bdmodels.migration_ops import (
+    CopyDataToPartial, CopyDataToPartials, MoveFieldsBetweenParts, PartialCopyMismatch, PopulatePart, ReclaimSpace,
+    VerifyPartialCopy,
+)
+
 from .models import BigModel
 
 
@@ -55,3 +64,242 @@ class BasicMigrationsTestCase(TransactionTestCase):
                 record[fld] == getattr(fetched, fld)
                 for fld in "id a b c d".split()
             ))
+
+
+class ChunkedCopyTestCase(TransactionTestCase):
+
+    def setUp(self):
+        call_command('migrate', 'testmigs', '0001_initial')
+        with connection.cursor() as cursor:
+            for i in range(1, 6):
+                cursor.execute(
+                    'insert into testmigs_bigmodel ("id", "a", "b", "c", "d") values(%s, %s, %s, %s, %s)',
+                    params=[i * 10, True, None, i, f"row{i}"],
+                )
+        # The partial model is created, but not filled
+        call_command('migrate', 'testmigs', '0002_break_big_model')
+        self.state = MigrationExecutor(connection).loader.project_state(('testmigs', '0002_break_big_model'))
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute('delete from testmigs_partial')
+        call_command('migrate')
+
+    def copy(self, operation):
+        with connection.schema_editor(atomic=False) as editor:
+            operation.database_forwards('testmigs', editor, self.state, self.state)
+
+    def partial_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute('select partial_id, c, d from testmigs_partial order by partial_id')
+            return cursor.fetchall()
+
+    def checkpoints(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'select name, last_pk from {CopyDataToPartial.CHECKPOINT_TABLE}')
+            return cursor.fetchall()
+
+    def test_chunks(self):
+        operation = CopyDataToPartial('BigModel', 'Partial', chunk_size=2)
+        self.assertIs(operation.atomic, False)
+        self.copy(operation)
+        self.assertEqual(self.partial_rows(), [(i * 10, i, f"row{i}") for i in range(1, 6)])
+        self.assertEqual(self.checkpoints(), [])
+
+    def test_atomic_migration(self):
+        operation = CopyDataToPartial('BigModel', 'Partial', chunk_size=2)
+        with self.assertRaisesMessage(ValueError, "must be in a non-atomic migration"):
+            with connection.schema_editor(atomic=True) as editor:
+                operation.database_forwards('testmigs', editor, self.state, self.state)
+        self.assertEqual(self.partial_rows(), [])
+
+    def test_resume(self):
+        operation = CopyDataToPartial('BigModel', 'Partial', chunk_size=2)
+        self.copy(CopyDataToPartial('BigModel', 'Partial', chunk_size=5))  # Creates the checkpoint table
+        with connection.cursor() as cursor:
+            cursor.execute('delete from testmigs_partial')
+            # As if interrupted after the first chunk
+            cursor.execute(
+                f'insert into {CopyDataToPartial.CHECKPOINT_TABLE} values (%s, %s)',
+                ['testmigs.bigmodel.partial.forwards', '20'],
+            )
+        self.copy(operation)
+        self.assertEqual(self.partial_rows(), [(i * 10, i, f"row{i}") for i in range(3, 6)])
+        self.assertEqual(self.checkpoints(), [])
+
+    def test_backwards_chunks(self):
+        self.copy(CopyDataToPartial('BigModel', 'Partial'))
+        with connection.cursor() as cursor:
+            cursor.execute("update testmigs_bigmodel set c = 0, d = ''")
+        operation = CopyDataToPartial('BigModel', 'Partial', chunk_size=2)
+        with connection.schema_editor(atomic=False) as editor:
+            operation.database_backwards('testmigs', editor, self.state, self.state)
+        with connection.cursor() as cursor:
+            cursor.execute('select id, c, d from testmigs_bigmodel order by id')
+            self.assertEqual(cursor.fetchall(), [(i * 10, i, f"row{i}") for i in range(1, 6)])
+
+    def test_copy_to_partials(self):
+        self.copy(CopyDataToPartials('BigModel', ['Partial'], chunk_size=2))
+        self.assertEqual(self.partial_rows(), [(i * 10, i, f"row{i}") for i in range(1, 6)])
+        self.assertEqual(self.checkpoints(), [])
+
+    @skipIf(connection.vendor == 'postgresql', "Tests the staging table, not used on PostgreSQL")
+    def test_copy_to_partials_failure(self):
+        with connection.cursor() as cursor:
+            cursor.execute("insert into testmigs_partial (partial_id, c, d) values (30, 99, 'there')")
+        operation = CopyDataToPartials('BigModel', ['Partial'])
+        with self.assertRaises(IntegrityError):
+            self.copy(operation)
+        # The staging table was dropped, so the copy can be retried
+        with connection.cursor() as cursor:
+            cursor.execute('delete from testmigs_partial')
+        self.copy(operation)
+        self.assertEqual(self.partial_rows(), [(i * 10, i, f"row{i}") for i in range(1, 6)])
+
+    def test_copy_to_overlapping_partials(self):
+        with self.assertRaisesMessage(ValueError, "Partial and Partial both have the column c"):
+            self.copy(CopyDataToPartials('BigModel', ['Partial', 'Partial']))
+
+    def test_populate_part(self):
+        with connection.cursor() as cursor:
+            cursor.execute("insert into testmigs_partial (partial_id, c, d) values (30, 99, 'there')")
+        self.copy(PopulatePart('BigModel', 'Partial', chunk_size=2))
+        # Defaults for the missing rows, the existing one left alone
+        self.assertEqual(
+            self.partial_rows(),
+            [(10, 3, "hi"), (20, 3, "hi"), (30, 99, "there"), (40, 3, "hi"), (50, 3, "hi")],
+        )
+        self.assertEqual(self.checkpoints(), [])
+
+    def test_populate_part_callable_default(self):
+        # A callable default gives all the rows the same value, also when they are created in chunks
+        field = self.state.apps.get_model('testmigs', 'Partial')._meta.get_field('c')
+        with mock.patch.object(field, 'get_default', side_effect=itertools.count(100)):
+            self.copy(PopulatePart('BigModel', 'Partial', chunk_size=2))
+        self.assertEqual(self.partial_rows(), [(i * 10, 100, "hi") for i in range(1, 6)])
+
+    def test_verify_copy(self):
+        self.copy(CopyDataToPartial('BigModel', 'Partial'))
+        operation = VerifyPartialCopy('BigModel', 'Partial', chunk_size=2)
+        self.copy(operation)
+        with connection.cursor() as cursor:
+            cursor.execute("update testmigs_partial set d = 'changed' where partial_id = 20")
+            cursor.execute("delete from testmigs_partial where partial_id = 40")
+            cursor.execute("insert into testmigs_partial (partial_id, c, d) values (45, 1, 'extra')")
+        with self.assertRaises(PartialCopyMismatch) as cm:
+            self.copy(operation)
+        self.assertEqual(cm.exception.pks, [20, 40, 45])
+
+
+class MoveFieldsTestCase(TransactionTestCase):
+
+    def tearDown(self):
+        call_command('migrate')
+
+    def columns(self, table):
+        with connection.cursor() as cursor:
+            return [column.name for column in connection.introspection.get_table_description(cursor, table)]
+
+    def test_move_and_back(self):
+        for i in range(1, 4):
+            BigModel.objects.create(a=True, c=i, d=f"row{i}")
+        state = MigrationExecutor(connection).loader.project_state(('testmigs', '0004_cleanup_big_model'))
+        operation = MoveFieldsBetweenParts('Partial', 'BigModel', ['d'], chunk_size=2)
+        new_state = state.clone()
+        operation.state_forwards('testmigs', new_state)
+        self.assertIn('d', new_state.models['testmigs', 'bigmodel'].fields)
+        self.assertNotIn('d', new_state.models['testmigs', 'partial'].fields)
+        with connection.schema_editor(atomic=False) as editor:
+            operation.database_forwards('testmigs', editor, state, new_state)
+        self.assertNotIn('d', self.columns('testmigs_partial'))
+        with connection.cursor() as cursor:
+            cursor.execute('select c, d from testmigs_bigmodel join testmigs_partial on id = partial_id order by id')
+            self.assertEqual(cursor.fetchall(), [(i, f"row{i}") for i in range(1, 4)])
+        with connection.schema_editor(atomic=False) as editor:
+            operation.database_backwards('testmigs', editor, new_state, state)
+        self.assertNotIn('d', self.columns('testmigs_bigmodel'))
+        self.assertEqual(
+            [(obj.c, obj.d) for obj in BigModel.objects.fetch_all_parents().order_by('id')],
+            [(i, f"row{i}") for i in range(1, 4)],
+        )
+
+    def move_state(self):
+        state = MigrationExecutor(connection).loader.project_state(('testmigs', '0004_cleanup_big_model'))
+        operation = MoveFieldsBetweenParts('Partial', 'BigModel', ['d'], chunk_size=2)
+        new_state = state.clone()
+        operation.state_forwards('testmigs', new_state)
+        return operation, state, new_state
+
+    def test_resume_after_fields_added(self):
+        for i in range(1, 4):
+            BigModel.objects.create(a=True, c=i, d=f"row{i}")
+        operation, state, new_state = self.move_state()
+        model = new_state.apps.get_model('testmigs', 'BigModel')
+        with connection.schema_editor(atomic=False) as editor:
+            # As if interrupted after the fields were added
+            editor.add_field(model, model._meta.get_field('d'))
+            operation.database_forwards('testmigs', editor, state, new_state)
+        with connection.cursor() as cursor:
+            cursor.execute('select d from testmigs_bigmodel order by id')
+            self.assertEqual(cursor.fetchall(), [(f"row{i}",) for i in range(1, 4)])
+        with connection.schema_editor(atomic=False) as editor:
+            operation.database_backwards('testmigs', editor, new_state, state)
+
+    def test_unmatched_rows(self):
+        objs = [BigModel.objects.create(a=True, c=i, d=f"row{i}") for i in range(1, 4)]
+        with connection.cursor() as cursor:
+            cursor.execute('delete from testmigs_bigmodel where id = %s', [objs[1].pk])
+        operation, state, new_state = self.move_state()
+        with self.assertRaisesMessage(ValueError, "1 rows of Partial have no rows of BigModel"):
+            with connection.schema_editor(atomic=False) as editor:
+                operation.database_forwards('testmigs', editor, state, new_state)
+        # Nothing was changed
+        self.assertNotIn('d', self.columns('testmigs_bigmodel'))
+        self.assertIn('d', self.columns('testmigs_partial'))
+        with connection.cursor() as cursor:
+            cursor.execute('delete from testmigs_partial')
+
+
+class ReclaimSpaceTestCase(TransactionTestCase):
+
+    def setUp(self):
+        self.state = MigrationExecutor(connection).loader.project_state(('testmigs', '0004_cleanup_big_model'))
+
+    def collect_sql(self, operation):
+        with connection.schema_editor(collect_sql=True, atomic=False) as editor:
+            operation.database_forwards('testmigs', editor, self.state, self.state)
+        return editor.collected_sql
+
+    def test_invalid_options(self):
+        with self.assertRaisesMessage(ValueError, "cluster and lock_tolerant cannot be used together"):
+            ReclaimSpace('BigModel', cluster=True, lock_tolerant=True)
+
+    @skipUnless(connection.vendor == 'sqlite', "Tests the SQLite statements")
+    def test_sqlite(self):
+        BigModel.objects.create(a=True, c=1, d="aloha")
+        self.assertEqual(self.collect_sql(ReclaimSpace('BigModel')), ['VACUUM;'])
+        self.assertEqual(self.collect_sql(ReclaimSpace('BigModel', lock_tolerant=True)), ['PRAGMA incremental_vacuum;'])
+        with connection.schema_editor(atomic=False) as editor:
+            ReclaimSpace('BigModel').database_forwards('testmigs', editor, self.state, self.state)
+        self.assertEqual(BigModel.objects.fetch_all_parents().get().d, "aloha")
+
+    @skipUnless(connection.vendor == 'postgresql', "Tests the PostgreSQL statements")
+    def test_postgresql(self):
+        self.assertEqual(self.collect_sql(ReclaimSpace('BigModel')), ['VACUUM FULL "testmigs_bigmodel";'])
+        self.assertEqual(
+            self.collect_sql(ReclaimSpace('BigModel', cluster=True)),
+            ['CLUSTER "testmigs_bigmodel" USING "testmigs_bigmodel_pkey";'],
+        )
+        self.assertEqual(
+            self.collect_sql(ReclaimSpace('BigModel', lock_tolerant=True)),
+            [
+                'UPDATE "testmigs_bigmodel" SET "id" = "id" WHERE 1 = 1;',
+                'VACUUM "testmigs_bigmodel";',
+            ],
+        )
+        BigModel.objects.bulk_create([BigModel(id=i, c=i) for i in range(1, 6)])
+        with connection.schema_editor(atomic=False) as editor:
+            ReclaimSpace('BigModel', lock_tolerant=True, chunk_size=2).database_forwards(
+                'testmigs', editor, self.state, self.state,
+            )
+        self.assertEqual(BigModel.objects.count(), 5)